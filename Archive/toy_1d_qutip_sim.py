@@ -9,32 +9,33 @@ Default:
 - 1 regulator qubit per site
 - optional reservoir qubit per site
 - 1 global ancilla A
-- runs T ticks and prints:
+- runs T ticks and prints (or, given a directory, streams to a ColumnRecorder):
   - <Z_Ri> for each site
   - P(Di=0) for each site
   - state norm (should remain 1)
 
+Observables are read from single-qubit reduced density matrices of the state
+(qprca_observables.py), computed once per tick for all sites.
+
+Usage:
+    python toy_1d_qutip_sim.py              # print every tick
+    python toy_1d_qutip_sim.py runs/        # one column directory per case
+
 This harness is aimed at reproducing the exact kind of debugging you did,
 but with a unitary streaming layer (no control/target overlap).
 ------------------------------------------------------------
 """
 
 from __future__ import annotations
-import numpy as np
-from qutip import basis, tensor, expect, Qobj
-from qutip.qip.operations import gate_expand_1toN
-
-from qprca_block_gate_1d import Layout1D, U_tick
+import os
+import sys
 
-def Z() -> Qobj:
-    return Qobj(np.array([[1, 0], [0, -1]], dtype=complex))
-
-def projector_0() -> Qobj:
-    v0 = basis(2, 0)
-    return v0 * v0.dag()
+import numpy as np
+from qutip import basis, tensor, Qobj
 
-def expand_1(n_qubits: int, gate1: Qobj, target: int) -> Qobj:
-    return gate_expand_1toN(gate1, n_qubits, target)
+from qprca_block_gate_1d import Layout1D
+from qprca_observables import ColumnRecorder, read_columns, site_observables
+from qprca_tick_cache import TickCache, tick_cache
 
 def build_initial_state(layout: Layout1D,
                         D_bits: list[int],
@@ -62,35 +63,38 @@ def run_case(name: str,
              R_bits: list[int],
              M_bits: list[int] | None,
              params: dict,
-             ticks: int = 5) -> None:
-    print(f"\n=== {name} ===")
+             ticks: int = 5,
+             cache: TickCache | None = None,
+             recorder: ColumnRecorder | None = None) -> None:
+    """
+    Evolve for `ticks` ticks. Observables are printed, or appended to
+    `recorder` (see ColumnRecorder.for_layout) when one is given.
+    """
+    if recorder is None:
+        print(f"\n=== {name} ===")
     psi = build_initial_state(layout, D_bits, R_bits, M_bits, A_bit=0)
 
-    # Observables
-    Zop = Z()
-    P0 = projector_0()
+    # layout and params are fixed for the whole run: build (or fetch) U once
+    if cache is None:
+        cache = tick_cache
+    U = cache.get(layout, **params)
 
     for t in range(ticks + 1):
         # Report
-        norm = float((psi.dag() * psi).full()[0, 0].real)
-
-        Z_R = []
-        P_D0 = []
-        for i in range(layout.N):
-            Zi = expand_1(layout.n_qubits, Zop, layout.idx_R(i))
-            Z_R.append(float(expect(Zi, psi).real))
-
-            Pi = expand_1(layout.n_qubits, P0, layout.idx_D(i))
-            P_D0.append(float(expect(Pi, psi).real))
-
-        print(f"t={t:02d}  norm={norm:.6f}  <Z_R>={['%+.3f'%z for z in Z_R]}  P(D=0)={['%.3f'%p for p in P_D0]}")
+        obs = site_observables(layout, psi)
+        if recorder is not None:
+            recorder.record_observables(t, obs)
+        else:
+            norm = float(obs["norm"])
+            Z_R = obs["Z_R"]
+            P_D0 = obs["P_D0"]
+            print(f"t={t:02d}  norm={norm:.6f}  <Z_R>={['%+.3f'%z for z in Z_R]}  P(D=0)={['%.3f'%p for p in P_D0]}")
 
         # Step
         if t < ticks:
-            U = U_tick(layout, **params)
             psi = U * psi
 
-def main():
+def main(record_dir: str | None = None):
     # Toggle reservoir
     use_reservoir = True
     layout = Layout1D(N=2, use_reservoir=use_reservoir)
@@ -109,29 +113,24 @@ def main():
     else:
         M0 = None
 
-    # High mismatch
-    # D0=0 (R), D1=1 (L)
-    run_case(
-        "High mismatch (D0=0, D1=1)",
-        layout=layout,
-        D_bits=[0, 1],
-        R_bits=[0, 0],
-        M_bits=M0,
-        params=params,
-        ticks=5,
-    )
-
-    # Low mismatch
-    # D0=0, D1=0
-    run_case(
-        "Low mismatch (D0=0, D1=0)",
-        layout=layout,
-        D_bits=[0, 0],
-        R_bits=[0, 0],
-        M_bits=M0,
-        params=params,
-        ticks=5,
-    )
+    cases = [
+        # High mismatch: D0=0 (R), D1=1 (L)
+        ("High mismatch (D0=0, D1=1)", "high_mismatch", [0, 1]),
+        # Low mismatch: D0=0, D1=0
+        ("Low mismatch (D0=0, D1=0)", "low_mismatch", [0, 0]),
+    ]
+    for name, tag, D_bits in cases:
+        case = dict(layout=layout, D_bits=D_bits, R_bits=[0, 0], M_bits=M0,
+                    params=params, ticks=5)
+        if record_dir is None:
+            run_case(name, **case)
+            continue
+        out = os.path.join(record_dir, tag)
+        with ColumnRecorder.for_layout(out, layout, meta=dict(params, D_bits=D_bits)) as rec:
+            run_case(name, recorder=rec, **case)
+        cols = read_columns(out)
+        print(f"{name}: {len(cols['t'])} ticks -> {out}  "
+              f"final norm={cols['norm'][-1]:.6f}  P(D=0)={[round(float(cols[f'P_D0_{i}'][-1]), 3) for i in range(layout.N)]}")
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -33,64 +33,107 @@ Where:
 ## Usage
 Run directly with Python 3:
     $ python HPF_Engine.py
+
+Or import the vectorised API (NumPy arrays or scalars):
+    sf = flux_ratio(dp_hk, dx)       # dp in hbar*k units, dx in metres
+    z = zeta(sf)                     # k=5.0, threshold=1.05 by default
+    state = classify(z)              # MATTER / BLUR / METADATA codes
+    STATE_NAMES[state]
 """
 
-import math
 import time
 
-def run_hpf_controller():
-    # --- Physical Constants ---
-    # Normalization unit: Momentum of one 780nm photon (8.5e-28 kg*m/s)
-    # Used to bridge the dimensionless engine to physical inputs.
-    HK_UNIT = 8.5e-28  
-    
-    # HPF Grid Calibration (The 'Projector Resolution' Constant)
-    # Calibrated to 2.0e-8 based on the Lu 2026 resolution limit.
-    PHI_GRID = HK_UNIT * 2.0e-8 
-
-    # --- Scenario Data ---
-    # These scenarios represent the three regimes of the HPF Phase Diagram.
-    scenarios = [
-        {"name": "BOHR LIMIT",     "dp_hk": 2.5,    "dx": 1.0e-7,  "desc": "Wave Metadata / Superposition"},
-        {"name": "LU EQUILIBRIUM", "dp_hk": 1.05,   "dx": 2.0e-8,  "desc": "The 2026 'Blur' Threshold"},
-        {"name": "STABLE FERMION", "dp_hk": 0.45,   "dx": 5.0e-11, "desc": "Solid Matter / Laminar Flow"},
-        {"name": "SGR A* HORIZON", "dp_hk": 1.5e15, "dx": 1.23e10, "desc": "Event Horizon Saturation"}
-    ]
+import numpy as np
+
+# --- Physical Constants ---
+# Normalization unit: Momentum of one 780nm photon (8.5e-28 kg*m/s)
+# Used to bridge the dimensionless engine to physical inputs.
+HK_UNIT = 8.5e-28
+
+# HPF Grid Calibration (The 'Projector Resolution' Constant)
+# Calibrated to 2.0e-8 based on the Lu 2026 resolution limit.
+PHI_GRID = HK_UNIT * 2.0e-8
+
+# Above this raw ratio Sf is log-mapped, to handle macro (Sgr A*) info density.
+LOG_SWITCH = 1000.0
+
+# k=5.0: The 'Rendering Slope'
+# threshold=1.05: The 'Lu Equilibrium Point'
+K_SLOPE = 5.0
+THRESHOLD = 1.05
+
+# Classification codes and zeta bounds
+MATTER, BLUR, METADATA = 0, 1, 2
+STATE_NAMES = np.array(["MATTER (LAMINAR)", "LU BLUR (CRITICAL)", "METADATA (TURBULENT)"])
+MATTER_ZETA = 0.75
+METADATA_ZETA = 0.25
+
+# --- Scenario Data ---
+# These scenarios represent the three regimes of the HPF Phase Diagram.
+SCENARIOS = [
+    {"name": "BOHR LIMIT",     "dp_hk": 2.5,    "dx": 1.0e-7,  "desc": "Wave Metadata / Superposition"},
+    {"name": "LU EQUILIBRIUM", "dp_hk": 1.05,   "dx": 2.0e-8,  "desc": "The 2026 'Blur' Threshold"},
+    {"name": "STABLE FERMION", "dp_hk": 0.45,   "dx": 5.0e-11, "desc": "Solid Matter / Laminar Flow"},
+    {"name": "SGR A* HORIZON", "dp_hk": 1.5e15, "dx": 1.23e10, "desc": "Event Horizon Saturation"}
+]
+
+def _result(out):
+    return out[()] if out.ndim == 0 else out
+
+def flux_ratio(dp_hk, dx):
+    """
+    Flux Ratio (Sf) = Input Density / Capacity Limit, element-wise.
+    dp_hk is the momentum spread in hbar*k units (HK_UNIT), dx in metres;
+    ratios above LOG_SWITCH are mapped to log10.
+    """
+    sf = np.asarray(np.multiply(np.multiply(dp_hk, HK_UNIT, dtype=np.float64), dx))
+    sf /= PHI_GRID
+    big = sf > LOG_SWITCH
+    np.log10(sf, out=sf, where=big)
+    return _result(sf)
+
+def zeta(sf, k=K_SLOPE, threshold=THRESHOLD):
+    """
+    The Zeta Stability Sigmoid 1 / (1 + e^(k (Sf - threshold))), element-wise.
+    Evaluated as e^-x / (1 + e^-x) for x > 0, so it never overflows.
+    """
+    x = np.asarray(np.subtract(sf, threshold, dtype=np.float64))
+    x *= k
+    pos = x > 0
+    e = np.abs(x, out=x)
+    np.negative(e, out=e)
+    np.exp(e, out=e)
+    z = np.where(pos, e, 1.0)
+    e += 1.0
+    z /= e
+    return _result(z)
+
+def classify(z):
+    """State codes for zeta values: MATTER (> 0.75), METADATA (< 0.25), else BLUR."""
+    z = np.asarray(z)
+    out = np.full(z.shape, BLUR, dtype=np.int8)
+    out[z > MATTER_ZETA] = MATTER
+    out[z < METADATA_ZETA] = METADATA
+    return _result(out)
+
+def run_hpf_controller(delay=0.1):
+    dp = np.array([item["dp_hk"] for item in SCENARIOS])
+    dx = np.array([item["dx"] for item in SCENARIOS])
+    sf = flux_ratio(dp, dx)
+    z = zeta(sf)
+    states = STATE_NAMES[classify(z)]
 
     print("="*85)
     print(f"{'OBJECTIVE':<18} | {'FLUX RATIO (Sf)':<16} | {'STABILITY (ζ)':<15} | {'STATE'}")
     print("="*85)
 
-    for item in scenarios:
-        # Calculate Absolute Momentum from normalized h-bar*k units
-        dp_abs = item["dp_hk"] * HK_UNIT
-        
-        # 1. Calculate Flux Ratio (Sf)
-        # Definition: Input Density / Capacity Limit
-        # We use log-mapping for Macro (Sgr A*) to handle the extreme info density.
-        raw_sf = (dp_abs * item["dx"]) / PHI_GRID
-        sf_val = math.log10(raw_sf) if raw_sf > 1000 else raw_sf
-        
-        # 2. The Zeta Stability Sigmoid
-        # k=5.0: The 'Rendering Slope'
-        # threshold=1.05: The 'Lu Equilibrium Point'
-        k = 5.0
-        threshold = 1.05
-        zeta = 1 / (1 + math.exp(k * (sf_val - threshold)))
-        
-        # Classification Mapping
-        if zeta > 0.75:
-            state = "MATTER (LAMINAR)"
-        elif zeta < 0.25:
-            state = "METADATA (TURBULENT)"
-        else:
-            state = "LU BLUR (CRITICAL)"
-
-        print(f"{item['name']:<18} | {sf_val:<16.4f} | {zeta:<15.4f} | {state}")
+    for item, sf_val, zeta_val, state in zip(SCENARIOS, sf, z, states):
+        print(f"{item['name']:<18} | {sf_val:<16.4f} | {zeta_val:<15.4f} | {state}")
         print(f"  > INFO: {item['desc']}")
         print("-" * 85)
-        time.sleep(0.1)
+        if delay:
+            time.sleep(delay)
 
 if __name__ == "__main__":
     run_hpf_controller()
-input("Press Enter to exit...")
+    input("Press Enter to exit...")
@@ -30,7 +30,8 @@ If the hypothesis holds, the population will converge on:
 import random
 import statistics
 import math
-import copy
+from array import array
+from collections import OrderedDict
 
 # --- CONFIGURATION ---
 POPULATION_SIZE = 100
@@ -39,6 +40,8 @@ FLUX_MAGNITUDE = 100.0  # The "Heat Death" scenario from Phase II
 INPUT_DIM = 20
 
 class KernelAgent:
+    __slots__ = ("id", "genome", "fitness")
+
     def __init__(self, id_tag, genome=None):
         self.id = id_tag
         if genome:
@@ -56,29 +59,33 @@ class KernelAgent:
         Apply the agent's 'Physics' to the input signal.
         Formula: Out = (In - (Mean * Gene0)) / ( (StdDev * Gene1) + epsilon )
         """
-        try:
-            local_mean = statistics.mean(signal_vector)
-            local_stdev = statistics.pstdev(signal_vector)
-            
-            # The Agent's unique transformation logic
-            bias_term = local_mean * self.genome[0]
-            scale_term = (local_stdev * self.genome[1])
-            
-            # Protection against divide-by-zero for the simulation's sake,
-            # though in physics this would just be a singularity (Death).
-            if abs(scale_term) < 1e-9: 
-                scale_term = 1.0 # Default to unity gain if gene is effectively zero
-
-            output = []
-            for x in signal_vector:
-                # Apply the transformation
-                val = (x - bias_term) / abs(scale_term)
-                output.append(val)
-            
-            return output
-
-        except Exception:
-            return [0.0] * len(signal_vector)
+        return process_signal(signal_vector, self.genome[0], self.genome[1])
+
+def process_signal(signal_vector, center, scale):
+    """KernelAgent.process for the genome [center, scale]."""
+    try:
+        local_mean = statistics.mean(signal_vector)
+        local_stdev = statistics.pstdev(signal_vector)
+        
+        # The Agent's unique transformation logic
+        bias_term = local_mean * center
+        scale_term = (local_stdev * scale)
+        
+        # Protection against divide-by-zero for the simulation's sake,
+        # though in physics this would just be a singularity (Death).
+        if abs(scale_term) < 1e-9: 
+            scale_term = 1.0 # Default to unity gain if gene is effectively zero
+
+        output = []
+        for x in signal_vector:
+            # Apply the transformation
+            val = (x - bias_term) / abs(scale_term)
+            output.append(val)
+        
+        return output
+
+    except Exception:
+        return [0.0] * len(signal_vector)
 
 def evaluate_fitness(agent):
     """
@@ -86,12 +93,28 @@ def evaluate_fitness(agent):
     Can the agent keep the signal 'alive' (measurable) without exploding?
     Target: Output signal should have variance ~1.0 (Unit Normal).
     """
+    return genome_fitness(agent.genome[0], agent.genome[1])
+
+def genome_fitness(center, scale):
+    """evaluate_fitness for the genome [center, scale]."""
+    return signal_fitness(draw_signal(), center, scale)
+
+def draw_signal():
     # Generate random High-Entropy Input (The "Chaos")
     # Mean is drifting, Variance is huge (Sf=100)
     drift = random.uniform(-500, 500)
-    input_signal = [random.gauss(drift, FLUX_MAGNITUDE) for _ in range(INPUT_DIM)]
-    
-    output = agent.process(input_signal)
+    return [random.gauss(drift, FLUX_MAGNITUDE) for _ in range(INPUT_DIM)]
+
+def draw_signal_batch(trials):
+    """Common random numbers: one batch of input signals shared by all agents."""
+    return [draw_signal() for _ in range(trials)]
+
+def batch_fitness(batch, center, scale):
+    """Mean fitness of the genome [center, scale] over a shared signal batch."""
+    return math.fsum(signal_fitness(sig, center, scale) for sig in batch) / len(batch)
+
+def signal_fitness(input_signal, center, scale):
+    output = process_signal(input_signal, center, scale)
     
     try:
         out_mean = statistics.mean(output)
@@ -115,7 +138,7 @@ def evaluate_fitness(agent):
 def mutate(genome):
     """Apply random mutations to the 'physics' constants."""
     mutation_rate = 0.1
-    new_genome = copy.deepcopy(genome)
+    new_genome = list(genome)  # genes are floats: a shallow copy is a full copy
     
     # Mutate Centering
     if random.random() < 0.3:
@@ -127,52 +150,152 @@ def mutate(genome):
         
     return new_genome
 
-def run_evolution():
+class FitnessCache:
+    """
+    Genome-keyed fitness memo for one shared signal batch.
+    
+    Under common random numbers an unchanged clone (~49% of children, when
+    neither gene mutates) scores exactly what its parent scored on the same
+    batch, so it is looked up instead of re-evaluated. Entries are only valid
+    for the batch they were computed on: clear() whenever the batch is
+    redrawn. Least recently used entries are evicted beyond maxsize.
+    """
+    __slots__ = ("maxsize", "hits", "misses", "_memo")
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+
+    def fitness(self, batch, center, scale):
+        key = (center, scale)
+        value = self._memo.get(key)
+        if value is not None:
+            self._memo.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = batch_fitness(batch, center, scale)
+        self._memo[key] = value
+        if len(self._memo) > self.maxsize:
+            self._memo.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._memo.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class AgentStore:
+    """
+    Array-backed population: no per-agent objects.
+    
+    Genomes live in a flat array('d') [c0, s0, c1, s1, ...] with a second
+    buffer of the same size; reproduce() writes the mutated children straight
+    into the back buffer and swaps, so a generation allocates nothing per
+    agent. Random draws happen in the same order as the KernelAgent loop, so
+    for the same random.seed() the two produce identical runs.
+    """
+    __slots__ = ("size", "genes", "spare", "fitness")
+
+    def __init__(self, size):
+        self.size = size
+        self.genes = array('d', [0.0]) * (2 * size)
+        self.spare = array('d', [0.0]) * (2 * size)
+        self.fitness = array('d', [0.0]) * size
+        for k in range(2 * size):
+            self.genes[k] = random.uniform(-0.5, 1.5)
+
+    def genome(self, i):
+        return [self.genes[2 * i], self.genes[2 * i + 1]]
+
+    def evaluate(self, batch=None, cache=None):
+        """
+        Fresh noise per agent (default), or every agent scored on the shared
+        signal `batch` (common random numbers), optionally through `cache`.
+        """
+        genes, fitness = self.genes, self.fitness
+        if batch is None:
+            if cache is not None:
+                raise ValueError("a fitness cache needs a shared signal batch")
+            for i in range(self.size):
+                fitness[i] = genome_fitness(genes[2 * i], genes[2 * i + 1])
+        elif cache is None:
+            for i in range(self.size):
+                fitness[i] = batch_fitness(batch, genes[2 * i], genes[2 * i + 1])
+        else:
+            for i in range(self.size):
+                fitness[i] = cache.fitness(batch, genes[2 * i], genes[2 * i + 1])
+        return fitness
+
+    def best(self):
+        """Index of the fittest agent (the first one on ties)."""
+        return max(range(self.size), key=self.fitness.__getitem__)
+
+    def reproduce(self, survival=0.2, mutation_rate=0.1):
+        """Truncation selection + mutation into the back buffer, then swap."""
+        order = sorted(range(self.size), key=self.fitness.__getitem__, reverse=True)
+        survivors = order[:int(self.size * survival)]
+        src, dst = self.genes, self.spare
+        for j in range(self.size):
+            p = 2 * random.choice(survivors)
+            c, s = src[p], src[p + 1]
+            if random.random() < 0.3:
+                c += random.gauss(0, mutation_rate)
+            if random.random() < 0.3:
+                s += random.gauss(0, mutation_rate)
+            dst[2 * j] = c
+            dst[2 * j + 1] = s
+        self.genes, self.spare = dst, src
+        for i in range(self.size):
+            self.fitness[i] = 0.0  # children are not evaluated yet
+
+def run_evolution(crn_trials=0, refresh_every=1, cache_size=4096):
+    """
+    crn_trials:    0 = fresh noise per agent (original experiment); otherwise
+                   every agent is scored on the same batch of crn_trials signals
+    refresh_every: generations between redraws of the shared batch
+    cache_size:    fitness cache entries under common random numbers (0 = off)
+    """
     print(f"--- HPF EVOLUTIONARY REGULATOR ---")
     print(f"Goal: Survive Flux Sf={FLUX_MAGNITUDE}")
     print(f"Hypothesis: Agents will invent 'Renormalization' (Genome -> [1.0, 1.0])")
     print("-" * 60)
     
-    population = [KernelAgent(i) for i in range(POPULATION_SIZE)]
+    population = AgentStore(POPULATION_SIZE)
+    cache = FitnessCache(cache_size) if crn_trials and cache_size else None
+    batch = None
     
     for gen in range(GENERATIONS):
         # 1. Evaluate
-        scores = []
-        for agent in population:
-            agent.fitness = evaluate_fitness(agent)
-            scores.append(agent.fitness)
-        
-        # Statistics for this generation
-        avg_score = statistics.mean(scores)
-        best_agent = max(population, key=lambda a: a.fitness)
+        if crn_trials and gen % refresh_every == 0:
+            batch = draw_signal_batch(crn_trials)
+            if cache is not None:
+                cache.clear()
+        population.evaluate(batch, cache)
+        best = population.best()
         
         # Visual logging every 10 gens
         if gen % 10 == 0 or gen == GENERATIONS - 1:
-            g_center = best_agent.genome[0]
-            g_scale = best_agent.genome[1]
-            print(f"Gen {gen:<3} | Best Fitness: {best_agent.fitness:.4f} | "
+            g_center, g_scale = population.genome(best)
+            print(f"Gen {gen:<3} | Best Fitness: {population.fitness[best]:.4f} | "
                   f"Strategy: SubMean*{g_center:.2f}, DivStd*{g_scale:.2f}")
 
-        # 2. Selection (Survival of the Fittest)
-        # Keep top 20%
-        sorted_pop = sorted(population, key=lambda a: a.fitness, reverse=True)
-        survivors = sorted_pop[:int(POPULATION_SIZE * 0.2)]
-        
-        # 3. Reproduction
-        new_pop = []
-        while len(new_pop) < POPULATION_SIZE:
-            parent = random.choice(survivors)
-            child_genome = mutate(parent.genome)
-            new_pop.append(KernelAgent(len(new_pop), child_genome))
-            
-        population = new_pop
+        # 2. Selection (Survival of the Fittest): keep top 20%
+        # 3. Reproduction into the spare genome buffer
+        population.reproduce(survival=0.2)
 
     print("-" * 60)
+    if cache is not None:
+        print(f"Fitness cache: {cache.hits} hits / {cache.misses} evaluations "
+              f"({cache.hit_rate:.0%} saved)")
     print("RESULT ANALYSIS:")
     
-    final_best = max(population, key=lambda a: a.fitness)
-    c_gene = final_best.genome[0]
-    s_gene = final_best.genome[1]
+    c_gene, s_gene = population.genome(population.best())
     
     print(f"Final Converged Strategy:")
     print(f"  > Mean Subtraction Factor: {c_gene:.4f} (Expected ~1.0)")
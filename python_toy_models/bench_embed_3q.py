@@ -0,0 +1,72 @@
+"""
+bench_embed_3q.py
+------------------------------------------------------------
+Benchmark: embedding CSWAP(A, D_0, D_{N-1}) into the full register.
+
+Compares, per layout size:
+  - permute : embed_3q_gate_permute (tensor on the last 3 slots + Qobj.permute)
+  - direct  : embed_3q_gate         (sparse operator built in target ordering)
+  - state   : qprca_statevector.apply_cswap (masked swap on the state tensor,
+              no operator at all)
+
+Usage:
+    python bench_embed_3q.py
+------------------------------------------------------------
+"""
+
+from __future__ import annotations
+import time
+
+import numpy as np
+
+from qprca_block_gate_1d import CSWAP, Layout1D, embed_3q_gate, embed_3q_gate_permute
+from qprca_statevector import apply_cswap, basis_state
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def layouts_in_range(n_min: int = 5, n_max: int = 13):
+    out = []
+    for use_reservoir in (False, True):
+        N = 2
+        while True:
+            layout = Layout1D(N=N, use_reservoir=use_reservoir)
+            if layout.n_qubits > n_max:
+                break
+            if layout.n_qubits >= n_min:
+                out.append(layout)
+            N += 1
+    return sorted(out, key=lambda l: (l.n_qubits, l.use_reservoir))
+
+def main(repeat: int = 3):
+    gate = CSWAP()
+    print(f"{'n_qubits':>8} {'N':>3} {'res':>4} | {'permute [ms]':>13} {'direct [ms]':>12} "
+          f"{'speedup':>8} | {'state [ms]':>11}")
+    print("-" * 72)
+
+    for layout in layouts_in_range():
+        qubits = (layout.idx_A, layout.idx_D(0), layout.idx_D(layout.N - 1))
+
+        U_ref = embed_3q_gate_permute(layout, gate, qubits)
+        U_new = embed_3q_gate(layout, gate, qubits)
+        if abs(U_ref.data - U_new.data).max() > 1e-12:
+            raise RuntimeError(f"embedding mismatch at n_qubits={layout.n_qubits}")
+
+        t_perm = _best_of(lambda: embed_3q_gate_permute(layout, gate, qubits), repeat)
+        t_direct = _best_of(lambda: embed_3q_gate(layout, gate, qubits), repeat)
+
+        psi = basis_state(layout, [0] * layout.N, [0] * layout.N,
+                          [0] * layout.N if layout.use_reservoir else None)
+        t_state = _best_of(lambda: apply_cswap(layout, psi, *qubits), repeat)
+
+        print(f"{layout.n_qubits:>8} {layout.N:>3} {str(layout.use_reservoir)[0]:>4} | "
+              f"{t_perm * 1e3:>13.3f} {t_direct * 1e3:>12.3f} "
+              f"{t_perm / t_direct:>7.1f}x | {t_state * 1e3:>11.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+bench_evo_regulator.py
+------------------------------------------------------------
+Benchmark: generations/second of the HPF evolutionary regulator.
+
+  reference : the original run_evolution loop body (a new KernelAgent per
+              child, copy.deepcopy in mutate)
+  store     : HPF_Evolutionary_Regulator.AgentStore (flat double-buffered
+              genome arrays, in-place reproduction)
+  vector    : hpf_evo_population.PopulationEngine, trials=1 (NumPy)
+
+Each size runs whole generations until at least `budget` seconds have
+passed. Evaluation (exact statistics.mean / pstdev per agent) dominates a
+generation, so the selection + reproduction phase, which is what the agent
+representation changes, is also timed on its own with preset fitness.
+reference and store consume the same random stream and are checked to end
+with identical genomes.
+
+Usage:
+    python bench_evo_regulator.py [budget_seconds [sizes ...]]
+------------------------------------------------------------
+"""
+
+import copy
+import random
+import sys
+import time
+
+from HPF_Evolutionary_Regulator import AgentStore, KernelAgent, evaluate_fitness
+from hpf_evo_population import PopulationEngine
+
+def reference_mutate(genome):
+    new_genome = copy.deepcopy(genome)
+    if random.random() < 0.3:
+        new_genome[0] += random.gauss(0, 0.1)
+    if random.random() < 0.3:
+        new_genome[1] += random.gauss(0, 0.1)
+    return new_genome
+
+def reference_generation(population):
+    for agent in population:
+        agent.fitness = evaluate_fitness(agent)
+    return reference_reproduce(population)
+
+def reference_reproduce(population):
+    sorted_pop = sorted(population, key=lambda a: a.fitness, reverse=True)
+    survivors = sorted_pop[:int(len(population) * 0.2)]
+    new_pop = []
+    while len(new_pop) < len(population):
+        parent = random.choice(survivors)
+        new_pop.append(KernelAgent(len(new_pop), reference_mutate(parent.genome)))
+    return new_pop
+
+def check(size=200, generations=5):
+    random.seed(11)
+    population = [KernelAgent(i) for i in range(size)]
+    for _ in range(generations):
+        population = reference_generation(population)
+    random.seed(11)
+    store = AgentStore(size)
+    for _ in range(generations):
+        store.evaluate()
+        store.reproduce()
+    if [a.genome for a in population] != [store.genome(i) for i in range(size)]:
+        raise RuntimeError("AgentStore diverges from the reference loop")
+
+def rate(generation, budget):
+    n = 0
+    t0 = time.perf_counter()
+    while True:
+        generation()
+        n += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= budget:
+            return n / elapsed
+
+def bench(size, budget):
+    random.seed(0)
+    pop = [KernelAgent(i) for i in range(size)]
+
+    def ref():
+        nonlocal pop
+        pop = reference_generation(pop)
+
+    random.seed(0)
+    store = AgentStore(size)
+
+    def packed():
+        store.evaluate()
+        store.reproduce()
+
+    engine = PopulationEngine(size=size, seed=0)
+    return rate(ref, budget), rate(packed, budget), rate(engine.step, budget)
+
+def bench_reproduce(size, budget):
+    """Selection + reproduction only, generations/s."""
+    random.seed(0)
+    pop = [KernelAgent(i) for i in range(size)]
+    store = AgentStore(size)
+
+    def ref():
+        nonlocal pop
+        for a in pop:
+            a.fitness = random.random()
+        pop = reference_reproduce(pop)
+
+    def packed():
+        for i in range(size):
+            store.fitness[i] = random.random()
+        store.reproduce()
+
+    return rate(ref, budget), rate(packed, budget)
+
+def main():
+    args = sys.argv[1:]
+    budget = float(args[0]) if args else 2.0
+    sizes = [int(float(a)) for a in args[1:]] or [100, 10_000, 100_000]
+
+    check()
+    print(f"{'population':>10} | {'reference':>10} {'store':>10} {'vector':>10} | "
+          f"{'store/ref':>9} {'vector/ref':>10}   (generations/s)")
+    print("-" * 74)
+    for size in sizes:
+        r, s, v = bench(size, budget)
+        print(f"{size:>10} | {r:>10.3f} {s:>10.3f} {v:>10.1f} | {s / r:>8.2f}x {v / r:>9.0f}x")
+
+    print()
+    print(f"{'population':>10} | {'reference':>10} {'store':>10} | {'store/ref':>9}"
+          f"   (selection + reproduction only, generations/s)")
+    print("-" * 74)
+    for size in sizes:
+        r, s = bench_reproduce(size, budget)
+        print(f"{size:>10} | {r:>10.1f} {s:>10.1f} | {s / r:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+bench_walk_kernels.py
+------------------------------------------------------------
+Benchmark: steps/second of the 2D gauge-metric walk physics loop.
+
+  reference : the original run_v5_fixed loop body (fancy-indexed stream_x /
+              stream_y / mix_step returning fresh arrays)
+  in-place  : WalkKernels.strang_step (strided views, per-tick couplings,
+              preallocated scratch)
+  fused     : hpf_walk_fused.FusedStrang, Strang + sponge in two sweeps
+              (Numba if installed, else the blocked NumPy fallback)
+
+Both loops also run update_geometry and the sponge boundaries, as
+run_v5_fixed does; plotting is excluded. Fields are checked to agree.
+
+Usage:
+    python bench_walk_kernels.py
+------------------------------------------------------------
+"""
+
+import time
+
+import numpy as np
+
+from hpf_walk_fused import FusedStrang, HAVE_NUMBA
+from hpf_walk_kernels import (
+    WalkKernels,
+    stream_x,
+    stream_y,
+    mix_step,
+    update_geometry,
+    make_sponge,
+    apply_open_boundaries,
+    renormalize,
+)
+
+S0 = np.pi / 2 * 0.95
+P_POWER = 2.5
+THETA0 = 0.05
+
+def initial_fields(H, W, Bz=0.030, q=1.0):
+    yy, xx = np.mgrid[0:H, 0:W]
+    alpha = np.ones((H, W), dtype=np.float64)
+    Ux = np.ones((H, W), dtype=np.complex128)
+    Uy = np.exp(1j * (q * Bz) * xx).astype(np.complex128)
+    env = np.exp(-((xx - W * 0.2) ** 2 + (yy - H * 0.5) ** 2) / (2 * 7 ** 2))
+    phi = (env * np.exp(1j * 0.75 * (xx - W * 0.2))).astype(np.complex128)
+    chi = np.zeros_like(phi)
+    phi, chi, _ = renormalize(phi, chi)
+    return phi, chi, alpha, Ux, Uy, make_sponge(H, W, thick=8)
+
+def run_reference(fields, steps):
+    phi, chi, alpha, Ux, Uy, sponge = (f.copy() for f in fields)
+    for _ in range(steps):
+        phi, chi = stream_x(phi, chi, alpha, Ux, S0, P_POWER, 0.5)
+        phi, chi = stream_y(phi, chi, alpha, Uy, S0, P_POWER, 1.0)
+        phi, chi = mix_step(phi, chi, alpha, THETA0)
+        phi, chi = stream_y(phi, chi, alpha, Uy, S0, P_POWER, 1.0)
+        phi, chi = stream_x(phi, chi, alpha, Ux, S0, P_POWER, 0.5)
+        alpha = update_geometry(alpha, phi, chi)
+        phi, chi = apply_open_boundaries(phi, chi, sponge)
+    return phi, chi, alpha
+
+def run_inplace(fields, steps):
+    phi, chi, alpha, Ux, Uy, sponge = (f.copy() for f in fields)
+    kernels = WalkKernels(*phi.shape)
+    for _ in range(steps):
+        kernels.strang_step(phi, chi, alpha, Ux, Uy, S0, P_POWER, THETA0)
+        alpha = update_geometry(alpha, phi, chi)
+        phi *= sponge
+        chi *= sponge
+    return phi, chi, alpha
+
+def run_fused(fields, steps):
+    phi, chi, alpha, Ux, Uy, sponge = (f.copy() for f in fields)
+    fused = FusedStrang(*phi.shape)
+    for k in range(steps):
+        phi, chi = fused.step(phi, chi, alpha, Ux, Uy, S0, P_POWER, THETA0,
+                              sponge=sponge if k else None)
+        alpha = update_geometry(alpha, phi, chi)
+    phi *= sponge
+    chi *= sponge
+    return phi, chi, alpha
+
+def steps_per_second(fn, fields, steps):
+    t0 = time.perf_counter()
+    fn(fields, steps)
+    return steps / (time.perf_counter() - t0)
+
+def main():
+    print(f"fused backend: {'numba' if HAVE_NUMBA else 'numpy'}")
+    print(f"{'grid':>11} {'steps':>6} | {'reference [st/s]':>17} {'in-place [st/s]':>16} "
+          f"{'fused [st/s]':>13} {'speedup':>8}")
+    print("-" * 80)
+    for (H, W), steps in (((100, 160), 200), ((1024, 1024), 10)):
+        fields = initial_fields(H, W)
+
+        ref = run_reference(fields, 3)
+        for fn in (run_inplace, run_fused):  # also warms up the JIT
+            err = max(np.abs(a - b).max() for a, b in zip(ref, fn(fields, 3)))
+            if err > 1e-10:
+                raise RuntimeError(f"{fn.__name__} mismatch on {H}x{W}: {err:.3e}")
+
+        r_ref = steps_per_second(run_reference, fields, steps)
+        r_new = steps_per_second(run_inplace, fields, steps)
+        r_fus = steps_per_second(run_fused, fields, steps)
+        print(f"{H:>5}x{W:<5} {steps:>6} | {r_ref:>17.1f} {r_new:>16.1f} {r_fus:>13.1f} "
+              f"{r_fus / r_ref:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+bench_walk_parallel.py
+------------------------------------------------------------
+Strong-scaling benchmark for the strip-decomposed 2D walk (hpf_walk_parallel).
+
+A fixed grid is advanced with 1, 2, 4, ... worker processes (up to the core
+count, or the list given on the command line); for each worker count we
+report steps/second, speedup over the first worker count and parallel
+efficiency. StripWalk keeps its worker processes between run() calls, so
+an untimed one-step warm-up pays for process spawn, imports, JIT compilation
+and first touch; the rate is that of the best of `repeats` timed runs.
+Before timing, a small grid is checked against the single-process WalkEngine.
+
+Usage:
+    python bench_walk_parallel.py [H W steps [workers ...]]
+    python bench_walk_parallel.py 4096 4096 20 1 2 4 8
+------------------------------------------------------------
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from hpf_walk_engine import WalkConfig, WalkEngine
+from hpf_walk_parallel import StripWalk
+
+def check(workers, steps=30):
+    cfg = WalkConfig(H=48, W=40, renorm_every=10, snapshot=False)
+    engine = WalkEngine(cfg)
+    for _ in range(steps):
+        engine.step()
+    with StripWalk(cfg, workers=workers) as walk:
+        walk.run(steps)
+        err = max(np.abs(walk.phi - engine.phi).max(), np.abs(walk.chi - engine.chi).max(),
+                  np.abs(walk.alpha - engine.alpha).max())
+    if err > 1e-10:
+        raise RuntimeError(f"strip run with {workers} workers disagrees: {err:.3e}")
+
+def timed_run(cfg, workers, steps, repeats=3):
+    """Best steps/s over `repeats` runs of `steps` steps, after a one-step warm-up."""
+    with StripWalk(cfg, workers=workers) as walk:
+        walk.run(1)
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            walk.run(steps)
+            best = min(best, time.perf_counter() - t0)
+    return steps / best
+
+def main():
+    args = [int(a) for a in sys.argv[1:]]
+    H, W, steps = args[:3] if len(args) >= 3 else (1024, 1024, 20)
+    cores = os.cpu_count() or 1
+    workers = args[3:] or [w for w in (1, 2, 4, 8, 16, 32, 64) if w <= cores] or [1]
+
+    check(max(workers))
+    cfg = WalkConfig(H=H, W=W, snapshot=False)
+    print(f"grid {H}x{W}, {steps} steps, {cores} cores")
+    print(f"{'workers':>7} | {'steps/s':>9} {'speedup':>8} {'efficiency':>11}")
+    print("-" * 42)
+    base = None
+    for w in workers:
+        rate = timed_run(cfg, w, steps)
+        base = base or rate
+        print(f"{w:>7} | {rate:>9.2f} {rate / base:>7.2f}x {rate / base / w:>10.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+hpf_evo_islands.py
+------------------------------------------------------------
+Island-model evolution for the HPF evolutionary regulator.
+
+`islands` independent populations (hpf_evo_population.PopulationEngine)
+evolve in a process pool. Every `migrate_every` generations (one epoch) the
+pool returns each island's state and the parent migrates: the best
+`migrants` survivors of island i replace randomly chosen members of island
+i + 1 (ring topology). migrate_every=0 keeps the islands fully independent.
+
+Seeding is deterministic and independent of scheduling: every island gets
+its own child of SeedSequence(seed) and carries its generator state between
+epochs, migration draws from a separate child, so a run reproduces exactly
+for any worker count.
+
+The final mean genome of each island is one sample of the converged strategy;
+report() gives their mean and standard error across islands as evidence for
+(or against) the [1.0, 1.0] renormalisation fixed point. With migration the
+islands are not independent, so the standard error is optimistic; use
+migrate_every=0 for a strict test.
+
+    with IslandEvolution(islands=8, size=20_000, trials=8, seed=1) as run:
+        run.run(generations=50)
+        print(format_report(run.report()))
+
+Usage:
+    python hpf_evo_islands.py [islands [workers]]
+------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, field
+import multiprocessing as mp
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from hpf_evo_population import PopulationEngine, format_stats
+from HPF_Evolutionary_Regulator import GENERATIONS
+
+TARGET = (1.0, 1.0)
+
+@dataclass
+class Island:
+    """State of one island, shipped to a worker and back every epoch."""
+    index: int
+    genomes: np.ndarray
+    rng_state: dict
+    generation: int = 0
+    elite: Optional[np.ndarray] = None
+    history: List[Dict[str, float]] = field(default_factory=list)
+
+def _evolve(args):
+    island, generations, options = args
+    engine = PopulationEngine(genomes=island.genomes, **options)
+    engine.rng.bit_generator.state = island.rng_state
+    engine.generation = island.generation
+    history = engine.run(generations)
+    island.genomes = engine.genomes
+    island.rng_state = engine.rng.bit_generator.state
+    island.generation = engine.generation
+    island.elite = engine.elite
+    island.history.extend(history)
+    return island
+
+class IslandEvolution:
+    """
+    islands:       number of populations
+    size:          population size per island
+    migrate_every: generations per epoch (0 = no migration)
+    migrants:      genomes sent from each island per migration
+    workers:       pool size (default: min(islands, cores); 1 runs in-process)
+    other keyword arguments are passed on to PopulationEngine
+    """
+
+    def __init__(self, islands: int = 4, size: int = 10_000, migrate_every: int = 10,
+                 migrants: int = 5, seed: int = 0, workers: Optional[int] = None,
+                 start_method: str = "spawn", **options):
+        if islands < 1:
+            raise ValueError("islands must be >= 1")
+        if migrants > size:
+            raise ValueError("cannot migrate more genomes than an island holds")
+        self.migrate_every = migrate_every
+        self.migrants = migrants
+        self.options = options
+        self.workers = workers or min(islands, os.cpu_count() or 1)
+
+        seeds = np.random.SeedSequence(seed).spawn(islands + 1)
+        self.rng = np.random.default_rng(seeds[0])  # migration
+        self.islands = []
+        for k, ss in enumerate(seeds[1:]):
+            engine = PopulationEngine(size=size, seed=ss, **options)
+            self.islands.append(Island(k, engine.genomes, engine.rng.bit_generator.state))
+
+        self._pool = None
+        if self.workers > 1:
+            self._pool = mp.get_context(start_method).Pool(self.workers)
+
+    def _epoch(self, generations: int) -> None:
+        jobs = [(isl, generations, self.options) for isl in self.islands]
+        if self._pool is None:
+            self.islands = [_evolve(job) for job in jobs]
+        else:
+            self.islands = self._pool.map(_evolve, jobs)
+
+    def migrate(self) -> None:
+        """Ring migration: best survivors of island i replace random members of i + 1."""
+        n = len(self.islands)
+        if n < 2 or not self.migrants:
+            return
+        emigrants = [isl.elite[:self.migrants].copy() for isl in self.islands]
+        for k, isl in enumerate(self.islands):
+            incoming = emigrants[(k - 1) % n]
+            slots = self.rng.choice(len(isl.genomes), size=len(incoming), replace=False)
+            isl.genomes[slots] = incoming
+
+    def run(self, generations: int = GENERATIONS) -> None:
+        epoch = self.migrate_every or generations
+        done = 0
+        while done < generations:
+            g = min(epoch, generations - done)
+            self._epoch(g)
+            done += g
+            if self.migrate_every and done < generations:
+                self.migrate()
+
+    def report(self) -> dict:
+        """Final population-mean genome per island, and their spread."""
+        means = np.array([isl.genomes.mean(axis=0) for isl in self.islands])
+        n = len(means)
+        se = means.std(axis=0, ddof=1) / np.sqrt(n) if n > 1 else np.full(2, np.nan)
+        return {
+            "islands": n,
+            "generations": self.islands[0].generation,
+            "island_means": means,
+            "mean": means.mean(axis=0),
+            "se": se,
+            "deviation": means.mean(axis=0) - np.array(TARGET),
+            "best": [isl.history[-1] for isl in self.islands if isl.history],
+        }
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "IslandEvolution":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def format_report(rep: dict) -> str:
+    lines = [f"{rep['islands']} islands after {rep['generations']} generations"]
+    for k, (m, last) in enumerate(zip(rep["island_means"], rep["best"])):
+        lines.append(f"  island {k:<3} mean [{m[0]:.4f}, {m[1]:.4f}]  | {format_stats(last)}")
+    mean, se, dev = rep["mean"], rep["se"], rep["deviation"]
+    lines.append(f"  across islands: Center_Bias {mean[0]:.4f} +/- {se[0]:.4f}, "
+                 f"Scale_Damp {mean[1]:.4f} +/- {se[1]:.4f}")
+    lines.append(f"  deviation from {list(TARGET)}: [{dev[0]:+.4f}, {dev[1]:+.4f}]")
+    return "\n".join(lines)
+
+def main():
+    args = [int(a) for a in sys.argv[1:]]
+    islands = args[0] if args else 8
+    workers = args[1] if len(args) > 1 else None
+    with IslandEvolution(islands=islands, size=20_000, trials=8, seed=1,
+                         workers=workers, sample_moments=True) as run:
+        run.run(GENERATIONS)
+        print(format_report(run.report()))
+
+if __name__ == "__main__":
+    main()
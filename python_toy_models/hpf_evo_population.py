@@ -0,0 +1,214 @@
+"""
+hpf_evo_population.py
+------------------------------------------------------------
+Vectorised population engine for the HPF evolutionary regulator
+(HPF_Evolutionary_Regulator.py).
+
+The reference run_evolution builds one KernelAgent per individual, draws one
+20-sample signal per agent with random.gauss and scores it with statistics.
+Here the whole population is arrays:
+
+    genomes  (P, 2)          gene 0 = centre bias, gene 1 = scale damp
+    signals  (P, T, D)       T trials of D samples per agent, drawn at once
+    fitness  (P,)            mean score over the T trials
+
+so populations of 10^5 - 10^6 run in a few array passes per generation and
+each agent is scored on T signals instead of one noisy sample.
+
+Scoring never materialises the processed output. For
+    out = (x - g0 * mean(x)) / |g1 * pstd(x)|     (|g1 pstd| < 1e-9 -> 1)
+the output moments are
+    mean(out) = (1 - g0) mean(x) / |s|,   pstd(out) = pstd(x) / |s|,
+so fitness needs only the per-trial (mean, pstd) of the input. With
+sample_moments=True even the signals are skipped: for Gaussian samples the
+sample mean ~ N(drift, F^2 / D) and D pstd^2 / F^2 ~ chi^2(D - 1),
+independently, so the moments are drawn directly with the same distribution.
+With common=True (common random numbers) one batch of T signals is drawn
+per generation and shared by every agent, so selection compares genomes on
+the same noise.
+
+    engine = PopulationEngine(size=100_000, trials=16, seed=1)
+    history = engine.run(generations=50)
+------------------------------------------------------------
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from HPF_Evolutionary_Regulator import FLUX_MAGNITUDE, GENERATIONS, INPUT_DIM, POPULATION_SIZE
+
+GENE_INIT = (-0.5, 1.5)
+DRIFT_RANGE = (-500.0, 500.0)
+SURVIVAL = 0.2
+MUTATION_SIGMA = 0.1
+MUTATION_PROB = 0.3
+SCALE_EPS = 1e-9
+
+# signals are generated in population chunks of at most this many samples
+CHUNK_SAMPLES = 1 << 22
+
+# -----------------------------
+# Signals and processing
+# -----------------------------
+def random_genomes(rng: np.random.Generator, n: int) -> np.ndarray:
+    return rng.uniform(*GENE_INIT, size=(n, 2))
+
+def draw_signals(rng: np.random.Generator, n: int, trials: int = 1,
+                 dim: int = INPUT_DIM, flux: float = FLUX_MAGNITUDE) -> np.ndarray:
+    """(n, trials, dim) high-entropy inputs: per-trial drift, Gaussian spread flux."""
+    drift = rng.uniform(*DRIFT_RANGE, size=(n, trials, 1))
+    return drift + flux * rng.standard_normal((n, trials, dim))
+
+def draw_moments(rng: np.random.Generator, n: int, trials: int = 1,
+                 dim: int = INPUT_DIM, flux: float = FLUX_MAGNITUDE):
+    """(mean, pstd), each (n, trials), distributed as those of draw_signals()."""
+    drift = rng.uniform(*DRIFT_RANGE, size=(n, trials))
+    mean = drift + (flux / np.sqrt(dim)) * rng.standard_normal((n, trials))
+    pstd = flux * np.sqrt(rng.chisquare(dim - 1, size=(n, trials)) / dim)
+    return mean, pstd
+
+def _scale(genomes: np.ndarray, pstd: np.ndarray) -> np.ndarray:
+    s = np.abs(pstd * genomes[:, 1, None])
+    return np.where(s < SCALE_EPS, 1.0, s)
+
+def process_batch(genomes: np.ndarray, signals: np.ndarray) -> np.ndarray:
+    """KernelAgent.process for every agent and trial: (P, T, D) -> (P, T, D)."""
+    mean = signals.mean(axis=-1)
+    pstd = signals.std(axis=-1)
+    s = _scale(genomes, pstd)
+    return (signals - (mean * genomes[:, 0, None])[..., None]) / s[..., None]
+
+def fitness_from_moments(genomes: np.ndarray, mean: np.ndarray, pstd: np.ndarray) -> np.ndarray:
+    """evaluate_fitness score per agent and trial, from the input moments."""
+    s = _scale(genomes, pstd)
+    out_mean = (1.0 - genomes[:, 0, None]) * mean / s
+    out_std = pstd / s
+    score = 1.0 / (1.0 + np.abs(out_mean)) / (1.0 + np.abs(out_std - 1.0))
+    return np.nan_to_num(score, nan=0.0)
+
+def evaluate_population(genomes: np.ndarray, rng: np.random.Generator, trials: int = 1,
+                        dim: int = INPUT_DIM, flux: float = FLUX_MAGNITUDE,
+                        sample_moments: bool = False, common: bool = False) -> np.ndarray:
+    """Mean fitness over `trials` signals per agent (shared if common), shape (P,)."""
+    n = len(genomes)
+    if common:
+        if sample_moments:
+            mean, pstd = draw_moments(rng, 1, trials, dim, flux)
+        else:
+            x = draw_signals(rng, 1, trials, dim, flux)
+            mean, pstd = x.mean(axis=-1), x.std(axis=-1)
+        return fitness_from_moments(genomes, mean, pstd).mean(axis=1)
+    if sample_moments:
+        mean, pstd = draw_moments(rng, n, trials, dim, flux)
+        return fitness_from_moments(genomes, mean, pstd).mean(axis=1)
+
+    out = np.empty(n)
+    step = max(1, CHUNK_SAMPLES // (trials * dim))
+    for a in range(0, n, step):
+        g = genomes[a:a + step]
+        x = draw_signals(rng, len(g), trials, dim, flux)
+        out[a:a + step] = fitness_from_moments(g, x.mean(axis=-1), x.std(axis=-1)).mean(axis=1)
+    return out
+
+# -----------------------------
+# Selection and reproduction
+# -----------------------------
+def select_survivors(fitness: np.ndarray, fraction: float = SURVIVAL) -> np.ndarray:
+    """Indices of the top `fraction` of the population (truncation selection)."""
+    k = max(1, int(len(fitness) * fraction))
+    return np.argpartition(-fitness, k - 1)[:k]
+
+def mutate_batch(genomes: np.ndarray, rng: np.random.Generator,
+                 sigma: float = MUTATION_SIGMA, prob: float = MUTATION_PROB) -> np.ndarray:
+    """mutate() for every row: each gene independently, with probability prob."""
+    hit = rng.random(genomes.shape) < prob
+    return genomes + hit * rng.normal(0.0, sigma, size=genomes.shape)
+
+def reproduce(genomes: np.ndarray, survivors: np.ndarray, rng: np.random.Generator,
+              n: int, sigma: float = MUTATION_SIGMA, prob: float = MUTATION_PROB) -> np.ndarray:
+    """n mutated children of parents drawn uniformly from the survivors."""
+    parents = genomes[rng.choice(survivors, size=n)]
+    return mutate_batch(parents, rng, sigma, prob)
+
+# -----------------------------
+# Engine
+# -----------------------------
+class PopulationEngine:
+    """
+    size:           population size
+    trials:         signals per agent per generation (fitness is their mean)
+    sample_moments: draw signal moments directly instead of full signals
+    common:         common random numbers, one signal batch per generation
+    genomes:        start from these genomes (size is taken from them) instead
+                    of drawing a random population
+    """
+
+    def __init__(self, size: int = POPULATION_SIZE, trials: int = 1, seed: Optional[int] = None,
+                 dim: int = INPUT_DIM, flux: float = FLUX_MAGNITUDE, survival: float = SURVIVAL,
+                 sigma: float = MUTATION_SIGMA, prob: float = MUTATION_PROB,
+                 sample_moments: bool = False, common: bool = False,
+                 genomes: Optional[np.ndarray] = None):
+        self.rng = np.random.default_rng(seed)
+        self.size = size if genomes is None else len(genomes)
+        self.trials = trials
+        self.dim = dim
+        self.flux = flux
+        self.survival = survival
+        self.sigma = sigma
+        self.prob = prob
+        self.sample_moments = sample_moments
+        self.common = common
+
+        self.genomes = random_genomes(self.rng, size) if genomes is None else genomes
+        self.fitness = np.zeros(self.size)
+        self.elite = self.genomes[:0].copy()  # survivors of the last step, best first
+        self.generation = 0
+
+    def evaluate(self) -> np.ndarray:
+        self.fitness = evaluate_population(self.genomes, self.rng, self.trials, self.dim,
+                                           self.flux, self.sample_moments, self.common)
+        return self.fitness
+
+    def step(self) -> Dict[str, float]:
+        """Evaluate, record statistics, select and reproduce one generation."""
+        fit = self.evaluate()
+        best = int(np.argmax(fit))
+        stats = {
+            "gen": self.generation,
+            "best_fitness": float(fit[best]),
+            "mean_fitness": float(fit.mean()),
+            "best_center": float(self.genomes[best, 0]),
+            "best_scale": float(self.genomes[best, 1]),
+            "mean_center": float(self.genomes[:, 0].mean()),
+            "mean_scale": float(self.genomes[:, 1].mean()),
+        }
+        survivors = select_survivors(fit, self.survival)
+        self.elite = self.genomes[survivors[np.argsort(-fit[survivors])]]
+        self.genomes = reproduce(self.genomes, survivors, self.rng, self.size, self.sigma, self.prob)
+        self.generation += 1
+        return stats
+
+    def run(self, generations: int = GENERATIONS, log_every: int = 0) -> List[Dict[str, float]]:
+        history = []
+        for _ in range(generations):
+            stats = self.step()
+            history.append(stats)
+            if log_every and (stats["gen"] % log_every == 0 or stats["gen"] == generations - 1):
+                print(format_stats(stats))
+        return history
+
+def format_stats(s: Dict[str, float]) -> str:
+    return (f"Gen {s['gen']:<3} | Best Fitness: {s['best_fitness']:.4f} | "
+            f"Strategy: SubMean*{s['best_center']:.2f}, DivStd*{s['best_scale']:.2f} | "
+            f"Population mean: [{s['mean_center']:.3f}, {s['mean_scale']:.3f}]")
+
+def main():
+    engine = PopulationEngine(size=100_000, trials=8, seed=0)
+    history = engine.run(GENERATIONS, log_every=10)
+    last = history[-1]
+    print(f"Population mean genome after {GENERATIONS} generations: "
+          f"[{last['mean_center']:.4f}, {last['mean_scale']:.4f}] (expected ~[1.0, 1.0])")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+hpf_flux_exact.py
+------------------------------------------------------------
+Exact steady state of the HPF flux-saturation lattice (simulate_flux.py).
+
+A lattice configuration is a vector of L counts in 0..SATURATION_LIMIT, so
+the chain has at most (SATURATION_LIMIT + 1)^L states, and one step is
+deterministic given two coin flips (injection, horizon sink). Starting from
+the empty lattice we enumerate the reachable states breadth-first, applying
+hpf_flux_engine.advance to whole frontiers at once (states are encoded as
+base-(S+1) integers), and build the sparse one-step transition matrix P
+together with the expected bounces r(s) of one step from each state.
+
+The chain is irreducible on the reachable set (no injection drains it back
+to empty) and aperiodic (empty -> empty), so its stationary distribution pi
+is unique. A few hundred power iterations give a first estimate; we then
+pin pi = 1 on the most probable state (pinning a rarely visited one, such as
+the empty lattice of a jammed chain, makes the system badly scaled), solve
+the remaining balance equations (I - P^T) x = b with GMRES started from the
+estimate, and normalise. The shadow floor is the expected bounces per step,
+
+    floor = sum_s pi(s) r(s),
+
+the t -> infinity limit of the Monte Carlo average (which also carries the
+start-up transient of a finite run). Above `max_states` reachable states the
+solver falls back to hpf_flux_engine.run_replicas.
+
+    res = steady_state(FluxParams(input_rate=0.9, sink_rate=0.5))
+    print(res.method, res.floor, res.states)
+------------------------------------------------------------
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from hpf_flux_engine import FluxParams, advance, run_replicas
+
+MAX_STATES = 2_000_000
+
+@dataclass
+class SteadyState:
+    params: FluxParams
+    method: str          # "exact" or "monte_carlo"
+    floor: float         # expected bounces per step
+    se: float            # 0 for exact, Monte Carlo standard error otherwise
+    states: int          # reachable states (0 if enumeration was abandoned)
+    residual: float      # ||pi P - pi||_1 (exact only)
+    occupancy: Optional[np.ndarray] = None  # mean packets per voxel (exact only)
+
+def _events(p: FluxParams):
+    """(inject, sink, probability) for the four coin-flip outcomes of one step."""
+    a, s = p.input_rate, p.sink_rate
+    out = [(True, True, a * s), (True, False, a * (1 - s)),
+           (False, True, (1 - a) * s), (False, False, (1 - a) * (1 - s))]
+    return [e for e in out if e[2] > 0]
+
+class StateCodec:
+    """Lattices (n, L) <-> integer codes in base saturation + 1."""
+
+    def __init__(self, p: FluxParams):
+        self.base = p.saturation + 1
+        self.L = p.lattice_size
+        if self.L * np.log2(self.base) >= 63:
+            raise OverflowError("state space does not fit 64-bit codes")
+        self.weights = self.base ** np.arange(self.L, dtype=np.int64)
+
+    def encode(self, lat: np.ndarray) -> np.ndarray:
+        return lat.astype(np.int64) @ self.weights
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return ((codes[:, None] // self.weights) % self.base).astype(np.int16)
+
+def _successors(codec: StateCodec, p: FluxParams, codes: np.ndarray):
+    """Per event: (successor codes, bounces) for every state in codes."""
+    lat0 = codec.decode(codes)
+    n = len(codes)
+    bounces = np.empty(n, dtype=np.int64)
+    out = []
+    for inject, sink, prob in _events(p):
+        lat = lat0.copy()
+        advance(lat, np.full(n, inject), np.full(n, sink), p.saturation, bounces)
+        out.append((codec.encode(lat), bounces.copy(), prob))
+    return out
+
+def reachable_states(p: FluxParams, max_states: int = MAX_STATES) -> Optional[np.ndarray]:
+    """Sorted codes of all states reachable from the empty lattice, or None above max_states."""
+    codec = StateCodec(p)
+    visited = np.zeros(1, dtype=np.int64)
+    frontier = visited
+    while len(frontier):
+        nxt = np.unique(np.concatenate([c for c, _, _ in _successors(codec, p, frontier)]))
+        frontier = nxt[~np.isin(nxt, visited, assume_unique=True)]
+        visited = np.union1d(visited, frontier)
+        if len(visited) > max_states:
+            return None
+    return visited
+
+def transition_matrix(p: FluxParams, states: np.ndarray) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """One-step transition matrix P (rows sum to 1) and expected bounces per state."""
+    codec = StateCodec(p)
+    n = len(states)
+    rows, cols, data = [], [], []
+    reward = np.zeros(n)
+    for codes, bounces, prob in _successors(codec, p, states):
+        rows.append(np.arange(n))
+        cols.append(np.searchsorted(states, codes))
+        data.append(np.full(n, prob))
+        reward += prob * bounces
+    P = sp.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(n, n))
+    return P, reward
+
+def stationary(P: sp.csr_matrix, tol: float = 1e-12, warm: int = 200) -> np.ndarray:
+    """
+    Stationary distribution of an irreducible chain: `warm` power iterations,
+    then GMRES on the balance equations with the most probable state pinned.
+    """
+    n = P.shape[0]
+    if n == 1:
+        return np.ones(1)
+    Q = P.T.tocsr()
+    pi = np.full(n, 1.0 / n)
+    for _ in range(warm):
+        pi = Q @ pi
+
+    k = int(np.argmax(pi))
+    keep = np.r_[0:k, k + 1:n]
+    Qc = Q.tocsc()
+    A = (sp.identity(n - 1, format="csc") - Qc[keep][:, keep]).tocsc()
+    b = Qc[keep][:, [k]].toarray().ravel()
+    x, info = spla.gmres(A, b, x0=pi[keep] / pi[k], rtol=tol, atol=0.0,
+                         restart=100, maxiter=1000)
+    if info != 0:
+        raise RuntimeError(f"stationary solve did not converge (gmres info={info})")
+    pi = np.empty(n)
+    pi[k] = 1.0
+    pi[keep] = x
+    return pi / pi.sum()
+
+def steady_state(p: FluxParams = FluxParams(), max_states: int = MAX_STATES,
+                 replicas: int = 4096, seed: Optional[int] = 0) -> SteadyState:
+    """Exact expected bounces per step, or a Monte Carlo estimate above max_states."""
+    try:
+        states = reachable_states(p, max_states)
+    except OverflowError:
+        states = None
+    if states is None:
+        mc = run_replicas(p, replicas=replicas, seed=seed)
+        return SteadyState(p, "monte_carlo", mc.mean, mc.se, 0, float("nan"))
+
+    P, reward = transition_matrix(p, states)
+    pi = stationary(P)
+    residual = float(np.abs(P.T @ pi - pi).sum())
+    occupancy = pi @ StateCodec(p).decode(states)
+    return SteadyState(p, "exact", float(pi @ reward), 0.0, len(states), residual, occupancy)
+
+def main():
+    p = FluxParams()
+    res = steady_state(p)
+    print(f"{res.method}: shadow floor {res.floor:.6f} bounces/step "
+          f"({res.states} reachable states, residual {res.residual:.1e})")
+    print("mean occupancy per voxel:", np.array2string(res.occupancy, precision=3))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+hpf_flux_sparse.py
+------------------------------------------------------------
+Occupancy-indexed update of the HPF flux-saturation lattice for very long
+lattices (10^5 - 10^6 voxels).
+
+The dense loop visits every voxel from L-1 down to 0 each step. Empty voxels
+do nothing, and a jammed backlog behaves as a block: take a chain
+
+    [lo .. hi]   lat[lo] >= 1,  lat[lo+1 .. hi] == SATURATION_LIMIT
+
+swept right to left. If voxel hi can pass a packet on (hi+1 below the limit,
+or the horizon absorbs), every voxel of the chain passes one in turn -- each
+refills the hole its right neighbour just opened -- so the net effect is
+lat[lo] -= 1, lat[hi+1] += 1 and no bounces. If hi is blocked, every voxel
+of the chain bounces: hi - lo + 1 bounces, no change. SparseLattice keeps the
+occupied voxels as a list of such chains and applies one O(1) rule per chain,
+so a step costs O(chains) instead of O(L).
+
+A chain costs several times more Python work than a dense voxel visit, so
+when the chains exceed `dense_fraction` of the lattice (a densely scattered
+fill) the lattice switches to the dense sweep itself and rescans for chains
+every `rescan_every` steps to switch back.
+
+Random numbers are drawn exactly where the dense loop draws them (injection
+every step, then the sink whenever the horizon voxel is occupied), so for the
+same stream the two produce bit-identical bounce counts and lattices.
+
+    lat = SparseLattice(FluxParams(lattice_size=10**6))
+    rand = random.Random(1).random
+    b = lat.step(rand)      # == dense_step(lattice, params, rand)
+------------------------------------------------------------
+"""
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from hpf_flux_engine import FluxParams, dense_step
+
+Chain = Tuple[int, int]
+
+DENSE_FRACTION = 0.08
+RESCAN_EVERY = 64
+
+class SparseLattice:
+    """
+    lat:    voxel counts (a plain list, for O(1) neighbour lookups)
+    chains: (lo, hi) chains covering every occupied voxel, in descending
+            order, or None while the dense sweep is in use
+    """
+
+    def __init__(self, params: FluxParams = FluxParams(), lattice: Optional[Sequence[int]] = None,
+                 dense_fraction: float = DENSE_FRACTION, rescan_every: int = RESCAN_EVERY):
+        self.params = params
+        L = params.lattice_size
+        self.lat: List[int] = [0] * L if lattice is None else [int(v) for v in lattice]
+        if len(self.lat) != L:
+            raise ValueError(f"lattice has {len(self.lat)} voxels, params say {L}")
+        self.max_chains = dense_fraction * L
+        self.rescan_every = rescan_every
+        self.dense_steps = 0
+        self.chains: Optional[List[Chain]] = None
+        self._use(self._scan())
+
+    def _use(self, chains: List[Chain]) -> None:
+        self.chains = chains if len(chains) <= self.max_chains else None
+
+    def _scan(self) -> List[Chain]:
+        """Chains of the whole lattice (O(L); used once at construction)."""
+        lat, sat = self.lat, self.params.saturation
+        out: List[Chain] = []
+        for i, v in enumerate(lat):
+            if v <= 0:
+                continue
+            if out and out[-1][1] == i - 1 and v >= sat:
+                out[-1] = (out[-1][0], i)
+            else:
+                out.append((i, i))
+        out.reverse()
+        return out
+
+    def step(self, rand: Callable[[], float]) -> int:
+        """One step of the dense rules, in place; returns the bounce count."""
+        if self.chains is None:
+            self.dense_steps += 1
+            bounces = dense_step(self.lat, self.params, rand)
+            if self.dense_steps % self.rescan_every == 0:
+                self._use(self._scan())
+            return bounces
+
+        p, lat, chains = self.params, self.lat, self.chains
+        last, sat = p.lattice_size - 1, p.saturation
+        bounces = 0
+
+        if rand() < p.input_rate:
+            if lat[0] < sat:
+                if lat[0] == 0:
+                    chains.append((0, 0))
+                lat[0] += 1
+            else:
+                bounces += 1
+
+        for lo, hi in chains:
+            if hi == last:
+                free = rand() < p.sink_rate
+            else:
+                free = lat[hi + 1] < sat
+                if free:
+                    lat[hi + 1] += 1
+            if free:
+                lat[lo] -= 1
+            else:
+                bounces += hi - lo + 1
+
+        self._use(self._rebuild(chains))
+        return bounces
+
+    def _rebuild(self, chains: List[Chain]) -> List[Chain]:
+        """
+        Chains after a step. Within a chain only lo and hi+1 can have changed
+        (the interior is saturated again either way), so each old chain is
+        re-cut into lo, its interior and hi+1, merging neighbours that form a
+        longer chain.
+        """
+        lat, sat, L = self.lat, self.params.saturation, self.params.lattice_size
+        out: List[Chain] = []
+        done = -1  # highest voxel already placed
+
+        def single(i):
+            nonlocal done
+            if i <= done:
+                return
+            done = i
+            v = lat[i]
+            if v <= 0:
+                return
+            if out and out[-1][1] == i - 1 and v >= sat:
+                out[-1] = (out[-1][0], i)
+            else:
+                out.append((i, i))
+
+        for lo, hi in reversed(chains):
+            single(lo)
+            if hi > lo:
+                if out and out[-1][1] == lo:
+                    out[-1] = (out[-1][0], hi)
+                else:  # lo emptied: the interior starts a chain of its own
+                    out.append((lo + 1, hi))
+                done = hi
+            if hi + 1 < L:
+                single(hi + 1)
+        out.reverse()
+        return out
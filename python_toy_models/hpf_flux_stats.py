@@ -0,0 +1,230 @@
+"""
+hpf_flux_stats.py
+------------------------------------------------------------
+Constant-memory statistics for long runs of the HPF flux-saturation lattice.
+
+run_hpf_simulation_v2 appends every post-warm-up bounce count to a list and
+runs a fixed number of steps. The accumulators here keep O(1) state:
+
+    Welford        running mean / variance of the samples
+    BatchMeans     standard error of the mean for autocorrelated samples:
+                   at most 2 * max_batches batch sums are kept; when full,
+                   neighbouring batches are merged and the batch length
+                   doubles. SE = std(batch means) / sqrt(batches), and
+                   tau = batch_len * var(batch means) / var(samples) is the
+                   integrated autocorrelation time (1 for independent samples)
+    RollingTail    the last n (step, value) pairs, for the ASCII plot only
+    WarmupDetector ends the warm-up once the means of consecutive windows
+                   agree within z standard errors for `passes` window pairs
+                   in a row (replacing `step > 50`); pairs with no variance
+                   at all -- e.g. zero bounces while a long lattice is still
+                   filling -- never count as agreeing
+
+run_streaming() combines them: one lattice is stepped with the reference
+rules (hpf_flux_engine.dense_step) until the standard error of the shadow
+floor drops under `tol`.
+
+    res = run_streaming(FluxParams(), tol=0.02, rng=random.Random(1))
+    print(res.mean, res.se, res.steps, res.warmup)
+------------------------------------------------------------
+"""
+
+from collections import deque
+from dataclasses import dataclass
+import math
+import random
+from typing import List, Optional, Tuple
+
+from hpf_flux_engine import FluxParams, dense_step
+
+class Welford:
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+    @property
+    def var(self) -> float:
+        """Sample variance (n - 1 denominator)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+class BatchMeans:
+    """Batch-means error estimate with a bounded number of batches."""
+
+    def __init__(self, max_batches: int = 64):
+        if max_batches < 2:
+            raise ValueError("max_batches must be >= 2")
+        self.max_batches = max_batches
+        self.batch_len = 1
+        self.sums: List[float] = []
+        self._current = 0.0
+        self._filled = 0
+        self.samples = Welford()
+
+    def push(self, x: float) -> bool:
+        """Add one sample; True if it completed a batch (the SE may have changed)."""
+        self.samples.push(x)
+        self._current += x
+        self._filled += 1
+        if self._filled < self.batch_len:
+            return False
+        self.sums.append(self._current)
+        self._current = 0.0
+        self._filled = 0
+        if len(self.sums) == 2 * self.max_batches:
+            self.sums = [self.sums[k] + self.sums[k + 1] for k in range(0, len(self.sums), 2)]
+            self.batch_len *= 2
+        return True
+
+    @property
+    def batches(self) -> int:
+        return len(self.sums)
+
+    def _batch_var(self) -> float:
+        k = len(self.sums)
+        if k < 2:
+            return float("inf")
+        means = [s / self.batch_len for s in self.sums]
+        m = math.fsum(means) / k
+        return math.fsum((x - m) ** 2 for x in means) / (k - 1)
+
+    @property
+    def se(self) -> float:
+        """Standard error of the mean of the completed batches."""
+        k = len(self.sums)
+        return math.sqrt(self._batch_var() / k) if k > 1 else float("inf")
+
+    @property
+    def tau(self) -> float:
+        """Integrated autocorrelation time estimate (in samples)."""
+        v = self.samples.var
+        return self.batch_len * self._batch_var() / v if v > 0 and len(self.sums) > 1 else float("nan")
+
+class RollingTail:
+    """Last `n` (step, value) pairs."""
+
+    def __init__(self, n: int = 20):
+        self.items: deque = deque(maxlen=n)
+
+    def push(self, step: int, value: int) -> None:
+        self.items.append((step, value))
+
+    def __iter__(self):
+        return iter(self.items)
+
+class WarmupDetector:
+    """
+    Compares the means of consecutive `window`-sample blocks; the warm-up is
+    over once `passes` consecutive pairs differ by less than z combined
+    standard errors (or after max_steps). A pair whose combined standard
+    error is 0 is constant, not stationary (a filling lattice bounces
+    nothing until its first packet reaches the horizon), and resets the
+    count. Sample autocorrelation makes the test conservative: it can only
+    prolong the warm-up.
+    """
+
+    def __init__(self, window: int = 50, z: float = 2.0, passes: int = 3,
+                 max_steps: Optional[int] = None):
+        self.window = window
+        self.z = z
+        self.passes = passes
+        self.max_steps = max_steps
+        self.steps = 0
+        self.done = False
+        self._streak = 0
+        self._prev: Optional[Tuple[float, float]] = None
+        self._block = Welford()
+
+    def push(self, x: float) -> bool:
+        """Feed one sample; True once the warm-up has ended (this sample included)."""
+        if self.done:
+            return True
+        self.steps += 1
+        self._block.push(x)
+        if self._block.n == self.window:
+            cur = (self._block.mean, self._block.var / self.window)
+            if self._prev is not None:
+                se = math.sqrt(cur[1] + self._prev[1])
+                agree = se > 0 and abs(cur[0] - self._prev[0]) <= self.z * se
+                self._streak = self._streak + 1 if agree else 0
+                self.done = self._streak >= self.passes
+            self._prev = cur
+            self._block = Welford()
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            self.done = True
+        return self.done
+
+@dataclass
+class StreamResult:
+    mean: float
+    var: float
+    se: float
+    tau: float
+    steps: int
+    warmup: int
+    converged: bool
+    tail: List[Tuple[int, int]]
+
+def run_streaming(p: FluxParams = FluxParams(), tol: float = 0.05, rng: Optional[random.Random] = None,
+                  max_steps: int = 10**7, min_samples: int = 1000, window: Optional[int] = None,
+                  tail: int = 20) -> StreamResult:
+    """
+    Step one lattice until the batch-means SE of the post-warm-up bounce
+    count drops under tol, or max_steps. At least min_samples samples are
+    taken first, so batches are long enough (>= min_samples / 128 samples)
+    for the SE to account for autocorrelation. The warm-up window defaults
+    to max(50, lattice_size) steps, the time a packet needs to cross the
+    lattice. p.steps and p.warmup are not used.
+    """
+    rand = (rng or random.Random()).random
+    lattice = [0] * p.lattice_size
+    if window is None:
+        window = max(50, p.lattice_size)
+    warm = WarmupDetector(window=window, max_steps=max_steps // 2)
+    stats = BatchMeans()
+    plot = RollingTail(tail)
+    warmup = 0
+    converged = False
+
+    for step in range(max_steps):
+        b = dense_step(lattice, p, rand)
+        if not warm.done:
+            if warm.push(b):
+                warmup = step + 1
+            continue
+        plot.push(step, b)
+        if stats.push(b) and stats.samples.n >= min_samples and stats.se < tol:
+            converged = True
+            break
+
+    s = stats.samples
+    return StreamResult(s.mean, s.var, stats.se, stats.tau, step + 1, warmup, converged, list(plot))
+
+def main():
+    """Regression check: a long lattice must not end its warm-up while filling."""
+    p = FluxParams(lattice_size=200)
+    rand = random.Random(1).random
+    lattice = [0] * p.lattice_size
+    first_bounce = None
+    for step in range(10 * p.lattice_size):
+        if dense_step(lattice, p, rand) and first_bounce is None:
+            first_bounce = step + 1
+    res = run_streaming(p, tol=0.5, rng=random.Random(1))
+    assert res.warmup > first_bounce, (res.warmup, first_bounce)
+    print(f"L={p.lattice_size}: first bounce at step {first_bounce}, warm-up ended at "
+          f"{res.warmup}; floor {res.mean:.4f} +/- {res.se:.4f} after {res.steps} steps")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+hpf_flux_sweep.py
+------------------------------------------------------------
+Phase-diagram sweeps of the HPF flux-saturation lattice (simulate_flux.py).
+
+The shadow floor is mapped over INPUT_RATE x SINK_RATE x SATURATION_LIMIT x
+LATTICE_SIZE. Every grid point runs `replicas` lattices on the vectorised
+hpf_flux_engine.ReplicaEngine; points are fanned out over a process pool.
+
+  - seeds:  each point's generator is seeded from (seed, its parameters),
+            so a point's result does not depend on the rest of the grid,
+            the scheduling or the number of processes;
+  - cache:  with cache_dir set, every finished point is written at once to
+            one small JSON file keyed by a hash of (parameters, replicas,
+            seed), so an interrupted sweep resumes where it stopped and
+            re-running a sweep only computes the new points;
+  - output: a tidy structured array, one record per point, with the
+            parameters, the mean and variance of the per-step bounce flux
+            and the standard error of the mean over replicas.
+
+    grid = flux_grid(input_rate=[0.3, 0.6, 0.9], sink_rate=[0.5, 0.9])
+    res = sweep(grid, replicas=2048, processes=4, cache_dir=".flux_cache")
+    print(format_table(res))
+------------------------------------------------------------
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, replace
+import hashlib
+import itertools
+import json
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from hpf_flux_engine import FluxParams, ReplicaEngine
+
+SWEEP_AXES = ("input_rate", "sink_rate", "saturation", "lattice_size")
+
+RESULT_DTYPE = np.dtype([
+    ("input_rate", np.float64),
+    ("sink_rate", np.float64),
+    ("saturation", np.int64),
+    ("lattice_size", np.int64),
+    ("steps", np.int64),
+    ("warmup", np.int64),
+    ("replicas", np.int64),
+    ("seed", np.int64),
+    ("mean", np.float64),   # bounces per step
+    ("var", np.float64),    # variance of the per-step bounce count
+    ("se", np.float64),     # standard error of mean, from the replica means
+])
+
+def flux_grid(input_rate: Sequence[float] = (0.9,),
+              sink_rate: Sequence[float] = (0.5,),
+              saturation: Sequence[int] = (2,),
+              lattice_size: Sequence[int] = (15,),
+              base: FluxParams = FluxParams()):
+    """Cartesian product of the axes, as FluxParams sharing base.steps / base.warmup."""
+    return [replace(base, input_rate=float(a), sink_rate=float(s), saturation=int(c),
+                    lattice_size=int(L))
+            for a, s, c, L in itertools.product(input_rate, sink_rate, saturation, lattice_size)]
+
+def _key(p: FluxParams, replicas: int, seed: int) -> str:
+    return json.dumps({"params": asdict(p), "replicas": replicas, "seed": seed}, sort_keys=True)
+
+def point_seed(p: FluxParams, seed: int) -> np.random.SeedSequence:
+    """Generator seed of one grid point, derived from the sweep seed and its parameters."""
+    digest = hashlib.sha1(json.dumps(asdict(p), sort_keys=True).encode("ascii")).digest()
+    return np.random.SeedSequence([seed, int.from_bytes(digest[:8], "little")])
+
+def run_point(p: FluxParams, replicas: int, seed: int) -> Dict[str, float]:
+    """Mean / variance of the bounce flux over replicas x recorded steps."""
+    engine = ReplicaEngine(p, replicas, seed=point_seed(p, seed))
+    total = np.zeros(replicas, dtype=np.int64)
+    total_sq = np.zeros(replicas, dtype=np.int64)
+    n = 0
+    for step in range(p.steps):
+        b = engine.step()
+        if step > p.warmup:
+            total += b
+            total_sq += b * b
+            n += 1
+    if not n:
+        raise ValueError(f"no steps recorded: steps must exceed warmup={p.warmup}")
+    means = total / n
+    mean = float(means.mean())
+    var = float(total_sq.sum() / (n * replicas) - mean**2)
+    se = float(means.std(ddof=1) / np.sqrt(replicas)) if replicas > 1 else float("nan")
+    return {"mean": mean, "var": var, "se": se}
+
+def _run(args):
+    return args, run_point(*args)
+
+class SweepCache:
+    """Finished grid points on disk, one JSON file per (parameters, replicas, seed)."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("ascii")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"flux_{digest}.json")
+
+    def load(self, p: FluxParams, replicas: int, seed: int) -> Optional[Dict[str, float]]:
+        key = _key(p, replicas, seed)
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry["result"] if entry.get("key") == key else None
+
+    def save(self, p: FluxParams, replicas: int, seed: int, result: Dict[str, float]) -> None:
+        key = _key(p, replicas, seed)
+        path = self._path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"key": key, "result": result}, f)
+        os.replace(tmp, path)  # never leave a half-written entry behind
+
+def sweep(grid: Sequence[FluxParams], replicas: int = 1024, seed: int = 0,
+          processes: Optional[int] = None, cache_dir: Optional[str] = None) -> np.ndarray:
+    """
+    Run every grid point (cached points are only loaded).
+
+    processes: if > 1, points are distributed over a process pool.
+    cache_dir: directory of the resume cache, or None to disable it.
+    """
+    cache = SweepCache(cache_dir) if cache_dir is not None else None
+    results: Dict[int, Dict[str, float]] = {}
+    todo = []
+    for k, p in enumerate(grid):
+        hit = cache.load(p, replicas, seed) if cache is not None else None
+        if hit is not None:
+            results[k] = hit
+        else:
+            todo.append(k)
+
+    def done(k, res):
+        results[k] = res
+        if cache is not None:
+            cache.save(grid[k], replicas, seed, res)
+
+    if processes is not None and processes > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {pool.submit(_run, (grid[k], replicas, seed)): k for k in todo}
+            for fut in as_completed(futures):
+                done(futures[fut], fut.result()[1])
+    else:
+        for k in todo:
+            done(k, run_point(grid[k], replicas, seed))
+
+    out = np.zeros(len(grid), dtype=RESULT_DTYPE)
+    for k, p in enumerate(grid):
+        for name in ("input_rate", "sink_rate", "saturation", "lattice_size", "steps", "warmup"):
+            out[name][k] = getattr(p, name)
+        out["replicas"][k] = replicas
+        out["seed"][k] = seed
+        for name, value in results[k].items():
+            out[name][k] = value
+    return out
+
+def format_table(res: np.ndarray) -> str:
+    lines = [f"{'input':>6} {'sink':>6} {'sat':>4} {'L':>6} | {'mean':>9} {'var':>9} {'se':>9}",
+             "-" * 58]
+    for r in res:
+        lines.append(f"{r['input_rate']:6.3f} {r['sink_rate']:6.3f} {r['saturation']:4d} "
+                     f"{r['lattice_size']:6d} | {r['mean']:9.4f} {r['var']:9.4f} {r['se']:9.5f}")
+    return "\n".join(lines)
+
+def main():
+    grid = flux_grid(input_rate=[0.3, 0.5, 0.7, 0.9], sink_rate=[0.5, 0.9],
+                     saturation=[1, 2], lattice_size=[15])
+    res = sweep(grid, replicas=1024, seed=0, processes=os.cpu_count())
+    print(format_table(res))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+hpf_walk_engine.py
+------------------------------------------------------------
+Headless engine for the HPF 2D gauge-metric Dirac walk.
+
+Runs exactly the physics of run_v5_fixed (Strang X/2 -> Y -> Mix -> Y -> X/2,
+geometry update, sponge boundaries, periodic renormalisation) without any
+plotting, and hands diagnostics to the caller:
+
+    engine = WalkEngine(WalkConfig(H=512, W=512, steps=5000))
+    for d in engine.run():          # generator, one item every diag_every
+        print(d.t, d.com_x, d.alpha_min)
+
+or run_walk(config, callback=fn). WalkConfig(fused=True) switches the tick to
+the two-sweep kernel of hpf_walk_fused.py (Numba if available); the geometry
+update runs through hpf_walk_geometry.GeometryRegulator (geometry_every /
+geometry_roi trade accuracy for work). Visualisation is a separate consumer
+(HPF_2D_Gauge-Metric_Walk.py renders live or from saved frames).
+
+Usage (prints diagnostics only):
+    python hpf_walk_engine.py
+------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+
+from hpf_walk_active import ActiveRegion
+from hpf_walk_fused import FusedStrang
+from hpf_walk_gauge import GaugeField
+from hpf_walk_geometry import GeometryRegulator
+from hpf_walk_kernels import (
+    WalkKernels,
+    density,
+    make_sponge,
+    renormalize,
+    com_of_density,
+    current_no_wrap,
+)
+
+@dataclass
+class WalkConfig:
+    H: int = 100
+    W: int = 160
+    steps: int = 450
+    Bz: float = 0.030
+    q: float = 1.0
+    s0: float = np.pi / 2 * 0.95
+    p_power: float = 2.5
+    theta0: float = 0.05
+    eta0: float = 0.10
+    relax: float = 0.02
+    heal: float = 0.005
+    floor: float = 0.02
+    renorm_every: int = 50
+    sponge_thick: int = 8
+
+    # geometry regulator cadence and region of interest (hpf_walk_geometry)
+    geometry_every: int = 1
+    geometry_roi: Optional[float] = None  # density threshold; None = full grid
+
+    # initial wavepacket: Gaussian at (0.2 W, 0.5 H), width sigma, momentum k0 along x
+    packet_sigma: float = 7.0
+    packet_k0: float = 0.75
+
+    # diagnostics cadence and payload
+    diag_every: int = 20
+    snapshot: bool = True       # include rho / alpha arrays in Diagnostics
+    with_current: bool = False  # include Jx / Jy arrays in Diagnostics
+
+    # fused two-sweep Strang + sponge kernel (hpf_walk_fused.FusedStrang)
+    fused: bool = False
+
+    # field precision: "complex128" (phi, chi, links; alpha/sponge float64) or
+    # "complex64" (float32 reals); see hpf_walk_precision for accuracy checks
+    dtype: str = "complex128"
+
+    # active-region mode (hpf_walk_active): evolve only the bounding box of
+    # cells with density > active_tol, re-measured every active_check ticks
+    active_tol: Optional[float] = None
+    active_check: int = 10
+
+    def field_dtypes(self):
+        """(complex dtype, real dtype) of the fields."""
+        cdt = np.dtype(self.dtype)
+        if cdt not in (np.complex64, np.complex128):
+            raise ValueError(f"dtype must be complex64 or complex128, got {self.dtype!r}")
+        return cdt, np.finfo(cdt).dtype
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+@dataclass
+class Diagnostics:
+    t: int
+    com_x: float
+    com_y: float
+    vx: float
+    vy: float
+    alpha_min: float
+    norm: float
+    geo_fraction: float = 1.0   # fraction of cells the regulator updated so far
+    active_fraction: float = 1.0  # fraction of cells evolved (active-region mode)
+    rho: Optional[np.ndarray] = None
+    alpha: Optional[np.ndarray] = None
+    Jx: Optional[np.ndarray] = None
+    Jy: Optional[np.ndarray] = None
+
+def initial_fields(cfg: WalkConfig) -> dict:
+    """
+    alpha, Ux, Uy, sponge and the normalised initial wavepacket phi, chi,
+    built in double precision and cast to cfg.dtype. Ux and Uy are the
+    compact LinkTable arrays (shapes (1, 1) and (1, W)).
+    """
+    H, W = cfg.H, cfg.W
+    cdt, rdt = cfg.field_dtypes()
+    yy, xx = np.mgrid[0:H, 0:W]
+    alpha = np.ones((H, W), dtype=np.float64)
+
+    # Gauge links (Landau gauge): Ux=1, Uy=exp(i q B x), in compact form
+    gauge = GaugeField.landau((H, W), cfg.q * cfg.Bz, dtype=cdt)
+    Ux, Uy = (table.U for table in gauge.at(0))
+
+    sponge = make_sponge(H, W, thick=cfg.sponge_thick)
+
+    # Initial wavepacket
+    x0, y0 = W * 0.2, H * 0.5
+    env = np.exp(-((xx - x0) ** 2 + (yy - y0) ** 2) / (2 * cfg.packet_sigma ** 2))
+    phi = (env * np.exp(1j * cfg.packet_k0 * (xx - x0))).astype(np.complex128)
+    chi = np.zeros_like(phi)
+    phi, chi, _ = renormalize(phi, chi)
+    return {"alpha": alpha.astype(rdt), "Ux": Ux, "Uy": Uy,
+            "sponge": sponge.astype(rdt), "phi": phi.astype(cdt), "chi": chi.astype(cdt)}
+
+def measure(cfg: WalkConfig, t: int, phi, chi, alpha, xx, yy, com_hist: list) -> Diagnostics:
+    """Diagnostics of (phi, chi, alpha) at tick t; appends the COM to com_hist."""
+    rho = density(phi, chi)
+    com_x, com_y = com_of_density(rho, xx, yy)
+    com_hist.append((t, com_x, com_y))
+
+    # crude velocity over last 2 samples (in steps)
+    if len(com_hist) >= 2:
+        t0, x0, y0 = com_hist[-2]
+        dt = (t - t0) if (t - t0) != 0 else 1
+        vx, vy = (com_x - x0) / dt, (com_y - y0) / dt
+    else:
+        vx, vy = 0.0, 0.0
+
+    d = Diagnostics(t=t, com_x=float(com_x), com_y=float(com_y),
+                    vx=float(vx), vy=float(vy),
+                    alpha_min=float(alpha.min()), norm=float(rho.sum()))
+    if cfg.snapshot:
+        d.rho = rho
+        d.alpha = alpha.copy()
+    if cfg.with_current:
+        d.Jx, d.Jy = current_no_wrap(phi, chi)
+    return d
+
+class WalkEngine:
+    """Owns the fields of one run and advances them tick by tick."""
+
+    def __init__(self, config: Optional[WalkConfig] = None, gauge: Optional[GaugeField] = None):
+        """gauge: links of the run; default is the Landau gauge of config.Bz."""
+        self.config = cfg = config or WalkConfig()
+        H, W = cfg.H, cfg.W
+
+        self.yy, self.xx = np.mgrid[0:H, 0:W]
+        f = initial_fields(cfg)
+        self.alpha, self.sponge = f["alpha"], f["sponge"]
+        self.phi, self.chi = f["phi"], f["chi"]
+        self.gauge = gauge or GaugeField((H, W), f["Ux"], f["Uy"], dtype=cfg.field_dtypes()[0])
+
+        cdt, rdt = cfg.field_dtypes()
+        self.kernels = WalkKernels(H, W, dtype=cdt)
+        self.regulator = GeometryRegulator(H, W, eta0=cfg.eta0, relax=cfg.relax, heal=cfg.heal,
+                                           floor=cfg.floor, every=cfg.geometry_every,
+                                           roi_threshold=cfg.geometry_roi, dtype=rdt)
+        self.fused = FusedStrang(H, W, dtype=cdt) if cfg.fused else None
+        self.active = None
+        if cfg.active_tol is not None:
+            if cfg.fused:
+                raise ValueError("active-region mode runs the in-place kernels; set fused=False")
+            self.active = ActiveRegion((H, W), tol=cfg.active_tol, check_every=cfg.active_check)
+            self._box_tools = {}
+            self._box_links = (None, None, None, None)  # box, gx, gy, their sub-tables
+        self._sponge_pending = False
+        self.t = 0
+        self.com_hist = []
+
+    def step(self) -> None:
+        """Advance one tick (loop index self.t), then increment self.t."""
+        self._advance()
+        self.settle()
+
+    def settle(self) -> None:
+        """
+        Apply a sponge pass deferred by the fused kernel. Fields are exact
+        tick-boundary values afterwards; a no-op on the unfused path.
+        """
+        if self._sponge_pending:
+            self.phi *= self.sponge
+            self.chi *= self.sponge
+            self._sponge_pending = False
+
+    def _tools(self, box):
+        """WalkKernels / GeometryRegulator sized for an active box (cached by shape)."""
+        if self.active is None:
+            return self.kernels, self.regulator
+        cfg = self.config
+        shape = self.active.box_shape
+        tools = self._box_tools.get(shape)
+        if tools is None:
+            cdt, rdt = cfg.field_dtypes()
+            tools = (WalkKernels(*shape, dtype=cdt),
+                     GeometryRegulator(*shape, eta0=cfg.eta0, relax=cfg.relax, heal=cfg.heal,
+                                       floor=cfg.floor, every=cfg.geometry_every,
+                                       roi_threshold=cfg.geometry_roi, dtype=rdt))
+            self._box_tools[shape] = tools
+        return tools
+
+    def _advance(self) -> None:
+        cfg = self.config
+        t = self.t
+
+        # STRANG: X/2 -> Y -> Mix -> Y -> X/2
+        gx, gy = self.gauge.at(t)
+        if self.fused is not None:
+            # the previous tick's sponge is folded into this tick's first sweep
+            sponge = self.sponge if self._sponge_pending else None
+            self.phi, self.chi = self.fused.step(self.phi, self.chi, self.alpha, gx.full(), gy.full(),
+                                                 cfg.s0, cfg.p_power, cfg.theta0, sponge=sponge)
+            box = (slice(None), slice(None))
+            regulator = self.regulator
+        else:
+            if self.active is not None:
+                box = self.active.update(t, self.phi, self.chi, self.alpha)
+                cbox, cgx, cgy, subs = self._box_links
+                # the tables themselves are kept, so a new table can never
+                # alias a freed one (as an id() key could)
+                if cbox != box or cgx is not gx or cgy is not gy:
+                    subs = (gx.sub(*box), gy.sub(*box))
+                    self._box_links = (box, gx, gy, subs)
+                gx, gy = subs
+            else:
+                box = (slice(None), slice(None))
+            kernels, regulator = self._tools(box)
+            kernels.strang_step(self.phi[box], self.chi[box], self.alpha[box], gx, gy,
+                                cfg.s0, cfg.p_power, cfg.theta0)
+
+        # Geometry update + absorbing boundaries
+        phi, chi = self.phi[box], self.chi[box]
+        regulator.update(self.alpha[box], phi, chi, t)
+        if self.fused is None:
+            phi *= self.sponge[box]
+            chi *= self.sponge[box]
+        else:
+            self._sponge_pending = True
+
+        # Renormalize occasionally (for stable visualization / diagnostics)
+        if cfg.renorm_every and (t % cfg.renorm_every == 0) and t > 0:
+            self.settle()
+            # whole grid, as in a full run: the below-tol tail outside an
+            # active box is part of the norm and is rescaled with the box
+            self.phi[...], self.chi[...], _ = renormalize(self.phi, self.chi)
+
+        self.t += 1
+
+    def diagnostics(self, t: Optional[int] = None) -> Diagnostics:
+        """Diagnostics of the current fields, labelled with tick t."""
+        t = self.t - 1 if t is None else t
+        self.settle()
+        d = measure(self.config, t, self.phi, self.chi, self.alpha, self.xx, self.yy, self.com_hist)
+        if self.active is None:
+            d.geo_fraction = self.regulator.fraction_updated
+        else:
+            updated = sum(reg.cells_updated for _, reg in self._box_tools.values())
+            d.geo_fraction = updated / (self.active.ticks * self.config.H * self.config.W)
+            d.active_fraction = self.active.work_fraction
+        return d
+
+    def run(self, steps: Optional[int] = None, snapshots=None) -> Iterator[Diagnostics]:
+        """
+        Advance `steps` ticks (default config.steps), yielding diagnostics.
+
+        snapshots: optional hpf_walk_snapshots.SnapshotWriter; fields are
+        stored at its own cadence after each tick.
+        """
+        steps = self.config.steps if steps is None else steps
+        every = self.config.diag_every
+        try:
+            for _ in range(steps):
+                t = self.t
+                self._advance()
+                if snapshots is not None:
+                    snapshots.record(self, t)
+                if every and t % every == 0:
+                    yield self.diagnostics(t)
+        finally:
+            self.settle()
+
+def run_walk(config: Optional[WalkConfig] = None,
+             callback: Optional[Callable[[Diagnostics], None]] = None,
+             snapshots=None) -> WalkEngine:
+    """
+    Run to completion, passing every Diagnostics to callback; returns the engine.
+    A SnapshotWriter passed as `snapshots` is closed at the end of the run.
+    """
+    engine = WalkEngine(config)
+    try:
+        for d in engine.run(snapshots=snapshots):
+            if callback is not None:
+                callback(d)
+    finally:
+        if snapshots is not None:
+            snapshots.close()
+    return engine
+
+def format_diagnostics(d: Diagnostics) -> str:
+    return (f"t={d.t:4d}  COM=({d.com_x:6.2f}, {d.com_y:6.2f})  "
+            f"v≈({d.vx:+.3f}, {d.vy:+.3f})  alpha_min={d.alpha_min:.3f}")
+
+def main():
+    run_walk(WalkConfig(snapshot=False), callback=lambda d: print(format_diagnostics(d)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+hpf_walk_fused.py
+------------------------------------------------------------
+Fused Strang step for the HPF 2D gauge-metric walk: two memory sweeps per tick.
+
+One tick of run_v5_fixed is  S (X/2 -> Y -> Mix -> Y -> X/2) -> G (geometry)
+-> B (sponge), where each stage is a separate pass over the complex grids.
+Here B of the previous tick and S of this tick are fused into two row sweeps,
+using the even/odd structure of the y-links:
+
+  sweep 1 (row pairs (2k, 2k+1), independent):
+      B_prev (sponge), X/2 on both rows, Y-parity-0 link between them
+  sweep 2 (row blocks with a 3-row halo, independent):
+      Y-parity-1 -> Mix -> Y-parity-0 -> Y-parity-1 -> X/2
+      Rows within 3 of a block edge depend on neighbours, so each block
+      recomputes its halo locally and writes only its own rows to a second
+      (double-buffered) output array.
+
+Folding the sponge into the *next* tick keeps G reading the pre-sponge fields
+exactly as in run_v5_fixed; the caller applies the pending sponge before the
+fields are observed (see WalkEngine.settle()).
+
+Backends:
+  - Numba (@njit(parallel=True)) if importable: scalar loops, prange over row
+    pairs / blocks, i.e. multi-core across rows.
+  - Pure NumPy fallback: the same two sweeps, vectorised per row block so the
+    working set stays cache-sized (single core).
+------------------------------------------------------------
+"""
+
+import numpy as np
+
+try:
+    import numba
+    from numba import prange
+except ImportError:  # optional dependency
+    numba = None
+    prange = range
+
+HAVE_NUMBA = numba is not None
+
+HALO = 3
+
+# -----------------------------
+# Pure-NumPy block kernels
+# -----------------------------
+def _np_pswap(xl, xr, c, j, link_l=None, link_r=None):
+    u = xl * link_l if link_l is not None else xl.copy()
+    v = xr * link_r if link_r is not None else xr.copy()
+    xl[...] = c * u + j * v
+    xr[...] = c * v + j * u
+
+def _np_coupling(a_lo, a_hi, s_base, hp):
+    s = s_base * (a_lo * a_hi) ** hp
+    return np.cos(s), -1j * np.sin(s)
+
+def _np_x_half(P, C, A, UX, sbx, hp):
+    W = P.shape[1]
+    for parity in (0, 1):
+        l = slice(parity, W - 1, 2)
+        r = slice(parity + 1, W, 2)
+        c, j = _np_coupling(A[:, l], A[:, r], sbx, hp)
+        _np_pswap(P[:, l], P[:, r], c, j, link_l=UX[:, l])
+        _np_pswap(C[:, l], C[:, r], c, j, link_r=np.conj(UX[:, l]))
+
+def _np_y(P, C, A, UY, sby, hp, first):
+    """y-links between local rows (first, first+1), (first+2, first+3), ..."""
+    n = P.shape[0]
+    d = slice(first, n - 1, 2)
+    u = slice(first + 1, n, 2)
+    c, j = _np_coupling(A[d], A[u], sby, hp)
+    _np_pswap(P[d], P[u], c, j, link_l=UY[d])
+    _np_pswap(C[d], C[u], c, j, link_r=np.conj(UY[d]))
+
+def _np_mix(P, C, A, theta0):
+    theta = theta0 * np.sqrt(A)
+    c, j = np.cos(theta), -1j * np.sin(theta)
+    p = P.copy()
+    P[...] = c * p + j * C
+    C[...] = j * p + c * C
+
+def _np_stage1(phi, chi, alpha, Ux, Uy, sponge, sbx, sby, hp, block, r0, r1):
+    block += block % 2  # keep y-parity-0 pairs inside a block
+    for a in range(r0, r1, block):
+        e = min(r1, a + block)
+        P, C = phi[a:e], chi[a:e]
+        if sponge is not None:
+            P *= sponge[a:e]
+            C *= sponge[a:e]
+        _np_x_half(P, C, alpha[a:e], Ux[a:e], sbx, hp)
+        _np_y(P, C, alpha[a:e], Uy[a:e], sby, hp, 0)
+
+def _np_stage2(phi, chi, alpha, Ux, Uy, out_phi, out_chi, sbx, sby, hp, theta0, block, r0, r1):
+    H = phi.shape[0]
+    for a in range(r0, r1, block):
+        e = min(r1, a + block)
+        lo, hi = max(0, a - HALO), min(H, e + HALO)
+        P, C = phi[lo:hi].copy(), chi[lo:hi].copy()
+        A, UY = alpha[lo:hi], Uy[lo:hi]
+        odd, even = (1 - lo) % 2, lo % 2  # local start of global parity 1 / 0
+        _np_y(P, C, A, UY, sby, hp, odd)
+        _np_mix(P, C, A, theta0)
+        _np_y(P, C, A, UY, sby, hp, even)
+        _np_y(P, C, A, UY, sby, hp, odd)
+        core = slice(a - lo, e - lo)
+        _np_x_half(P[core], C[core], alpha[a:e], Ux[a:e], sbx, hp)
+        out_phi[a:e] = P[core]
+        out_chi[a:e] = C[core]
+
+# -----------------------------
+# Numba kernels
+# -----------------------------
+if HAVE_NUMBA:
+    _jit = numba.njit(cache=True, inline="always")
+
+    @_jit
+    def _nb_x_half_row(P, C, i, A, UX, g, sbx, hp, mi):
+        W = P.shape[1]
+        for parity in range(2):
+            for l in range(parity, W - 1, 2):
+                r = l + 1
+                s = sbx * (A[g, l] * A[g, r]) ** hp
+                c = np.cos(s)
+                j = mi * np.sin(s)
+                u = P[i, l] * UX[g, l]
+                v = P[i, r]
+                P[i, l] = c * u + j * v
+                P[i, r] = c * v + j * u
+                u = C[i, l]
+                v = C[i, r] * np.conj(UX[g, l])
+                C[i, l] = c * u + j * v
+                C[i, r] = c * v + j * u
+
+    @_jit
+    def _nb_y_pair(P, C, i, A, UY, g, sby, hp, mi):
+        W = P.shape[1]
+        for x in range(W):
+            s = sby * (A[g, x] * A[g + 1, x]) ** hp
+            c = np.cos(s)
+            j = mi * np.sin(s)
+            u = P[i, x] * UY[g, x]
+            v = P[i + 1, x]
+            P[i, x] = c * u + j * v
+            P[i + 1, x] = c * v + j * u
+            u = C[i, x]
+            v = C[i + 1, x] * np.conj(UY[g, x])
+            C[i, x] = c * u + j * v
+            C[i + 1, x] = c * v + j * u
+
+    @_jit
+    def _nb_mix_row(P, C, i, A, g, theta0, mi):
+        W = P.shape[1]
+        for x in range(W):
+            th = theta0 * np.sqrt(A[g, x])
+            c = np.cos(th)
+            j = mi * np.sin(th)
+            p = P[i, x]
+            q = C[i, x]
+            P[i, x] = c * p + j * q
+            C[i, x] = j * p + c * q
+
+    @numba.njit(cache=True, parallel=True)
+    def _nb_stage1(phi, chi, alpha, Ux, Uy, sponge, use_sponge, sbx, sby, hp, mi, r0, r1):
+        W = phi.shape[1]
+        for k in prange((r1 - r0 + 1) // 2):
+            y = r0 + 2 * k
+            for r in range(y, min(y + 2, r1)):
+                if use_sponge:
+                    for x in range(W):
+                        phi[r, x] *= sponge[r, x]
+                        chi[r, x] *= sponge[r, x]
+                _nb_x_half_row(phi, chi, r, alpha, Ux, r, sbx, hp, mi)
+            if y + 1 < r1:
+                _nb_y_pair(phi, chi, y, alpha, Uy, y, sby, hp, mi)
+
+    @numba.njit(cache=True, parallel=True)
+    def _nb_stage2(phi, chi, alpha, Ux, Uy, out_phi, out_chi, sbx, sby, hp, theta0, mi, block, r0, r1):
+        H, W = phi.shape
+        nblocks = (r1 - r0 + block - 1) // block
+        for b in prange(nblocks):
+            a = r0 + b * block
+            e = min(r1, a + block)
+            lo = max(0, a - HALO)
+            hi = min(H, e + HALO)
+            P = phi[lo:hi].copy()
+            C = chi[lo:hi].copy()
+            odd = lo + (1 - lo) % 2
+            even = lo + lo % 2
+            for d in range(odd, hi - 1, 2):
+                _nb_y_pair(P, C, d - lo, alpha, Uy, d, sby, hp, mi)
+            for g in range(lo, hi):
+                _nb_mix_row(P, C, g - lo, alpha, g, theta0, mi)
+            for d in range(even, hi - 1, 2):
+                _nb_y_pair(P, C, d - lo, alpha, Uy, d, sby, hp, mi)
+            for d in range(odd, hi - 1, 2):
+                _nb_y_pair(P, C, d - lo, alpha, Uy, d, sby, hp, mi)
+            for g in range(a, e):
+                _nb_x_half_row(P, C, g - lo, alpha, Ux, g, sbx, hp, mi)
+                for x in range(W):
+                    out_phi[g, x] = P[g - lo, x]
+                    out_chi[g, x] = C[g - lo, x]
+
+# -----------------------------
+# Driver
+# -----------------------------
+class FusedStrang:
+    """
+    Two-sweep (sponge_prev + Strang) step with double-buffered outputs.
+
+        phi, chi = fused.step(phi, chi, alpha, Ux, Uy, s0, p, theta0, sponge)
+
+    The returned arrays are internal buffers; the arrays passed in become the
+    next step's output buffers, so always rebind to the return value.
+    sponge (optional) is applied to the inputs before the Strang sequence.
+    """
+
+    def __init__(self, H, W, dtype=np.complex128, block_rows=32, use_numba=None,
+                 dt_x=0.5, dt_y=1.0):
+        if use_numba and not HAVE_NUMBA:
+            raise ImportError("numba is not installed")
+        self.use_numba = HAVE_NUMBA if use_numba is None else bool(use_numba)
+        self.block_rows = max(1, int(block_rows))
+        self.dt_x = dt_x
+        self.dt_y = dt_y
+        self.shape = (H, W)
+        self.dtype = np.dtype(dtype)
+        # scalars in the field precision, so complex64 runs stay in single
+        # precision inside the Numba kernels
+        self._real = np.finfo(self.dtype).dtype.type
+        self._mi = self.dtype.type(-1j)
+        self._out_phi = self._out_chi = None  # allocated by the first step()
+
+    def step(self, phi, chi, alpha, Ux, Uy, s0, p, theta0, sponge=None):
+        if self._out_phi is None:
+            self._out_phi = np.empty(self.shape, dtype=self.dtype)
+            self._out_chi = np.empty(self.shape, dtype=self.dtype)
+        out_phi, out_chi = self._out_phi, self._out_chi
+        self.first_sweep(phi, chi, alpha, Ux, Uy, s0, p, sponge)
+        self.second_sweep(phi, chi, alpha, Ux, Uy, out_phi, out_chi, s0, p, theta0)
+        self._out_phi, self._out_chi = phi, chi
+        return out_phi, out_chi
+
+    # The two sweeps on their own, restricted to rows [r0, r1). Used by the
+    # strip workers of hpf_walk_parallel.py, which synchronise in between;
+    # r0 must be even so that y-parity-0 pairs stay inside the range.
+    def first_sweep(self, phi, chi, alpha, Ux, Uy, s0, p, sponge=None, rows=None):
+        """In place on rows [r0, r1): sponge (optional), X/2, y-parity-0 links."""
+        r0, r1 = rows if rows is not None else (0, phi.shape[0])
+        if r0 % 2:
+            raise ValueError("first_sweep rows must start on an even row")
+        sbx, sby, hp = self._real(s0 * self.dt_x), self._real(s0 * self.dt_y), self._real(0.5 * p)
+        if self.use_numba:
+            use_sponge = sponge is not None
+            sp = sponge if use_sponge else alpha  # placeholder with the right ndim
+            _nb_stage1(phi, chi, alpha, Ux, Uy, sp, use_sponge, sbx, sby, hp, self._mi, r0, r1)
+        else:
+            _np_stage1(phi, chi, alpha, Ux, Uy, sponge, sbx, sby, hp, self.block_rows, r0, r1)
+
+    def second_sweep(self, phi, chi, alpha, Ux, Uy, out_phi, out_chi, s0, p, theta0, rows=None):
+        """Rows [r0, r1) of out_*: Y1, Mix, Y0, Y1, X/2 (reads a 3-row halo of phi/chi)."""
+        r0, r1 = rows if rows is not None else (0, phi.shape[0])
+        sbx, sby, hp = self._real(s0 * self.dt_x), self._real(s0 * self.dt_y), self._real(0.5 * p)
+        if self.use_numba:
+            _nb_stage2(phi, chi, alpha, Ux, Uy, out_phi, out_chi,
+                       sbx, sby, hp, self._real(theta0), self._mi, self.block_rows, r0, r1)
+        else:
+            _np_stage2(phi, chi, alpha, Ux, Uy, out_phi, out_chi,
+                       sbx, sby, hp, theta0, self.block_rows, r0, r1)
@@ -0,0 +1,152 @@
+"""
+hpf_walk_gauge.py
+------------------------------------------------------------
+Compact gauge links for the HPF 2D gauge-metric walk.
+
+run_v5_fixed stores Ux (all ones) and Uy = exp(i q B x) as full H x W complex
+arrays and, on every half-step, slices them per link parity and conjugates
+them again for the chi rail. Neither field needs that: Ux is a constant and
+the Landau-gauge Uy depends on x only.
+
+LinkTable holds the links of one direction in their smallest broadcastable
+form, one of
+
+    uniform   shape (1, 1)    identity links (U = 1) skip the multiply entirely
+    row       shape (1, W)    depends on x only (Landau gauge Uy)
+    column    shape (H, 1)    depends on y only
+    full      shape (H, W)    arbitrary user field
+
+and precomputes, once, the per-parity link slices and their conjugates that
+WalkKernels._stream multiplies by. GaugeField pairs an x- and a y-table and
+serves them per tick; time-dependent fields are built by a user callable and
+cached (LRU, keyed by tick, or by tick modulo `period` for periodic drives).
+
+    gauge = GaugeField.landau((H, W), q * Bz)
+    gx, gy = gauge.at(t)
+    kernels.strang_step(phi, chi, alpha, gx, gy, s0, p, theta0)
+------------------------------------------------------------
+"""
+
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from hpf_walk_kernels import link_slices
+
+class LinkTable:
+    """Links along one axis (axis=1: x-links, axis=0: y-links) in compact form."""
+
+    def __init__(self, U, shape: Tuple[int, int], axis: int, dtype=np.complex128):
+        U = np.asarray(U, dtype=dtype)
+        if U.ndim == 0:
+            U = U.reshape(1, 1)
+        elif U.ndim == 1:
+            U = U.reshape(1, -1)  # 1-D input is a row: links depend on x only
+        if U.ndim != 2 or np.broadcast_shapes(U.shape, shape) != tuple(shape):
+            raise ValueError(f"links of shape {U.shape} do not broadcast to {tuple(shape)}")
+
+        self.U = U
+        self.shape = tuple(shape)
+        self.axis = axis
+        self.identity = U.size == 1 and U.flat[0] == 1
+
+        # per parity: (U on the left site of each link, its conjugate), shaped
+        # to broadcast against phi[l]; (None, None) for identity links
+        self.pairs = []
+        for l, _ in link_slices(self.shape[axis], axis):
+            if self.identity:
+                self.pairs.append((None, None))
+                continue
+            lb = tuple(s if U.shape[k] > 1 else slice(None) for k, s in enumerate(l))
+            link = np.ascontiguousarray(U[lb])
+            self.pairs.append((link, np.conj(link)))
+
+    @property
+    def kind(self) -> str:
+        rows, cols = self.U.shape
+        if rows == 1 and cols == 1:
+            return "uniform"
+        if rows == 1:
+            return "row"
+        if cols == 1:
+            return "column"
+        return "full"
+
+    @property
+    def nbytes(self) -> int:
+        return self.U.nbytes + sum(a.nbytes for pair in self.pairs for a in pair if a is not None)
+
+    def sub(self, rows: slice, cols: slice) -> "LinkTable":
+        """Links of the sub-grid [rows, cols] (rows.start/cols.start even keeps parity)."""
+        shape = (len(range(*rows.indices(self.shape[0]))), len(range(*cols.indices(self.shape[1]))))
+        U = self.U[rows if self.U.shape[0] > 1 else slice(None),
+                   cols if self.U.shape[1] > 1 else slice(None)]
+        return LinkTable(U, shape, self.axis, dtype=self.U.dtype)
+
+    def full(self) -> np.ndarray:
+        """Read-only H x W view (no copy), for kernels that index links per site."""
+        return np.broadcast_to(self.U, self.shape)
+
+class GaugeField:
+    """
+    x- and y-links of a run, static or time dependent.
+
+    Static:          GaugeField(shape, Ux, Uy)
+    Time dependent:  GaugeField.time_dependent(shape, links_at, period=None)
+                     with links_at(t) -> (Ux, Uy) in any LinkTable form.
+    """
+
+    def __init__(self, shape: Tuple[int, int], Ux=1.0, Uy=1.0, dtype=np.complex128):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._links_at: Optional[Callable] = None
+        self._static = (LinkTable(Ux, self.shape, axis=1, dtype=self.dtype),
+                        LinkTable(Uy, self.shape, axis=0, dtype=self.dtype))
+
+    @classmethod
+    def landau(cls, shape: Tuple[int, int], qB: float, dtype=np.complex128) -> "GaugeField":
+        """Uniform field B along z in Landau gauge: Ux = 1, Uy = exp(i q B x)."""
+        x = np.arange(shape[1])
+        return cls(shape, Ux=1.0, Uy=np.exp(1j * qB * x), dtype=dtype)
+
+    @classmethod
+    def time_dependent(cls, shape: Tuple[int, int], links_at: Callable,
+                       period: Optional[int] = None, maxsize: int = 16,
+                       dtype=np.complex128) -> "GaugeField":
+        gauge = cls.__new__(cls)
+        gauge.shape = tuple(shape)
+        gauge.dtype = np.dtype(dtype)
+        gauge._links_at = links_at
+        gauge._static = None
+        gauge.period = period
+        gauge.maxsize = maxsize
+        gauge._cache = OrderedDict()
+        gauge.hits = 0
+        gauge.misses = 0
+        return gauge
+
+    @property
+    def static(self) -> bool:
+        return self._links_at is None
+
+    def at(self, t: int) -> Tuple[LinkTable, LinkTable]:
+        """(x-links, y-links) for tick t."""
+        if self._links_at is None:
+            return self._static
+
+        key = t % self.period if self.period else t
+        tables = self._cache.get(key)
+        if tables is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return tables
+
+        self.misses += 1
+        Ux, Uy = self._links_at(t)
+        tables = (LinkTable(Ux, self.shape, axis=1, dtype=self.dtype),
+                  LinkTable(Uy, self.shape, axis=0, dtype=self.dtype))
+        self._cache[key] = tables
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return tables
@@ -0,0 +1,225 @@
+"""
+hpf_walk_geometry.py
+------------------------------------------------------------
+Buffered geometry regulator for the HPF 2D gauge-metric walk.
+
+update_geometry (hpf_walk_kernels) builds d0, two zero-padded gradient
+arrays, r, target and alpha_next as fresh full-grid arrays on every tick.
+GeometryRegulator computes the same update
+
+    r      = |phi - chi|^2 + 0.5 * (gx + gy)       (open-boundary gradients)
+    target = clip(1 - eta0 * r, floor, 1)
+    alpha  = clip((1 - relax) alpha + relax target + heal (1 - alpha), floor, 1)
+
+into buffers owned by the regulator, updating alpha in place. With Numba
+installed r and alpha are produced in one pass over the grid; the NumPy
+fallback accumulates into the same buffers with ufunc out= arguments.
+
+Two ways to do less work:
+  every=k        update only on ticks t % k == 0 and apply the k-tick
+                 composition of the relaxation map (exact if r were frozen
+                 over the k ticks), so the healing rate per tick is unchanged
+  roi_threshold  update only cells where density(phi, chi) >= threshold or
+                 alpha has not yet healed back to 1 (alpha < 1 - alpha_tol).
+                 This is an approximation: a low-density cell next to a dense
+                 region still has a nonzero gradient term in r, and skipping
+                 it leaves alpha at 1 where the full update would lower it
+                 (by up to relax * eta0 * r per update) until the field
+                 crosses the threshold there. Lowering the threshold widens
+                 the region (the margin around the dense cells) and shrinks
+                 the error; with every=k the skipped updates are k ticks long
+
+Each update records the fraction of cells it touched (last_fraction) and a
+running total (fraction_updated) so the saving can be reported.
+------------------------------------------------------------
+"""
+
+from typing import Optional
+
+import numpy as np
+
+try:
+    import numba
+    from numba import prange
+except ImportError:  # optional dependency
+    numba = None
+    prange = range
+
+HAVE_NUMBA = numba is not None
+
+# -----------------------------
+# NumPy helpers
+# -----------------------------
+def _add_abs2(z, acc, tmp):
+    """acc += |z|^2 without a complex temporary."""
+    np.multiply(z.real, z.real, out=tmp)
+    acc += tmp
+    np.multiply(z.imag, z.imag, out=tmp)
+    acc += tmp
+
+# -----------------------------
+# Numba single-pass kernel
+# -----------------------------
+if HAVE_NUMBA:
+    @numba.njit(cache=True, parallel=True)
+    def _nb_regulate(alpha, phi, chi, r, eta0, floor, decay, gain, heal_gain,
+                     use_roi, roi_threshold, alpha_cut):
+        H, W = alpha.shape
+        counts = np.zeros(H, dtype=np.int64)
+        for y in prange(H):
+            n = 0
+            for x in range(W):
+                p = phi[y, x]
+                c = chi[y, x]
+                if use_roi:
+                    rho = p.real * p.real + p.imag * p.imag + c.real * c.real + c.imag * c.imag
+                    if rho < roi_threshold and alpha[y, x] >= alpha_cut:
+                        r[y, x] = 0.0
+                        continue
+                d = p - c
+                g = 0.0
+                if x + 1 < W:
+                    dp = phi[y, x + 1] - p
+                    dc = chi[y, x + 1] - c
+                    g += dp.real * dp.real + dp.imag * dp.imag + dc.real * dc.real + dc.imag * dc.imag
+                if y + 1 < H:
+                    dp = phi[y + 1, x] - p
+                    dc = chi[y + 1, x] - c
+                    g += dp.real * dp.real + dp.imag * dp.imag + dc.real * dc.real + dc.imag * dc.imag
+                rr = d.real * d.real + d.imag * d.imag + 0.5 * g
+                r[y, x] = rr
+                target = min(max(1.0 - eta0 * rr, floor), 1.0)
+                a = decay * alpha[y, x] + gain * target + heal_gain
+                alpha[y, x] = min(max(a, floor), 1.0)
+                n += 1
+            counts[y] = n
+        return counts.sum()
+
+# -----------------------------
+# Regulator
+# -----------------------------
+class GeometryRegulator:
+    """
+    In-place, buffered replacement for update_geometry.
+
+        reg = GeometryRegulator(H, W, eta0=0.10, every=1, roi_threshold=None)
+        reg.update(alpha, phi, chi, t)     # alpha is modified in place
+
+    After an update, reg.r holds the roughness field (zero on cells skipped
+    by the region of interest).
+    """
+
+    def __init__(self, H, W, eta0=0.10, relax=0.02, heal=0.005, floor=0.02,
+                 every=1, roi_threshold: Optional[float] = None, alpha_tol=1e-6,
+                 dtype=np.float64, use_numba=None):
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        if use_numba and not HAVE_NUMBA:
+            raise ImportError("numba is not installed")
+        self.use_numba = HAVE_NUMBA if use_numba is None else bool(use_numba)
+        self.eta0, self.relax, self.heal, self.floor = eta0, relax, heal, floor
+        self.every = int(every)
+        self.roi_threshold = roi_threshold
+        self.alpha_tol = alpha_tol
+
+        # k-tick composition of a -> (1 - relax - heal) a + relax target + heal
+        decay = 1.0 - relax - heal
+        rate = relax + heal
+        self._decay = decay ** self.every
+        scale = (1.0 - self._decay) / rate if rate else float(self.every)
+        self._gain = relax * scale
+        self._heal_gain = heal * scale
+
+        ctype = np.result_type(dtype, np.complex64)
+        self.r = np.zeros((H, W), dtype=dtype)
+        self._g = np.empty((H, W), dtype=dtype)
+        self._f = np.empty((H, W), dtype=dtype)
+        self._c = np.empty((H, W), dtype=ctype)
+        self._mask = np.empty((H, W), dtype=bool) if roi_threshold is not None else None
+        self._mask2 = np.empty((H, W), dtype=bool) if roi_threshold is not None else None
+
+        self.last_fraction = 0.0
+        self.cells_updated = 0
+        self.cells_seen = 0
+
+    @property
+    def fraction_updated(self) -> float:
+        """Cells updated / cells seen over all calls (skipped ticks count as seen)."""
+        return self.cells_updated / self.cells_seen if self.cells_seen else 0.0
+
+    def due(self, t: int) -> bool:
+        return t % self.every == 0
+
+    def update(self, alpha, phi, chi, t: int = 0) -> float:
+        """Regulate alpha in place on tick t; returns the fraction of cells updated."""
+        size = alpha.size
+        self.cells_seen += size
+        if not self.due(t):
+            self.last_fraction = 0.0
+            return 0.0
+
+        if self.use_numba:
+            use_roi = self.roi_threshold is not None
+            n = int(_nb_regulate(alpha, phi, chi, self.r, self.eta0, self.floor,
+                                 self._decay, self._gain, self._heal_gain, use_roi,
+                                 self.roi_threshold if use_roi else 0.0,
+                                 1.0 - self.alpha_tol))
+        else:
+            n = self._update_numpy(alpha, phi, chi)
+
+        self.cells_updated += n
+        self.last_fraction = n / size
+        return self.last_fraction
+
+    def roughness(self, phi, chi):
+        """r = |phi - chi|^2 + 0.5 (gx + gy) into self.r (NumPy path)."""
+        r, g, f, c = self.r, self._g, self._f, self._c
+
+        np.subtract(phi, chi, out=c)
+        r.fill(0.0)
+        _add_abs2(c, r, f)
+
+        g.fill(0.0)
+        for field in (phi, chi):
+            np.subtract(field[:, 1:], field[:, :-1], out=c[:, :-1])
+            _add_abs2(c[:, :-1], g[:, :-1], f[:, :-1])
+            np.subtract(field[1:, :], field[:-1, :], out=c[:-1, :])
+            _add_abs2(c[:-1, :], g[:-1, :], f[:-1, :])
+        g *= 0.5
+        r += g
+        return r
+
+    def _region(self, alpha, phi, chi):
+        """ROI mask: density >= roi_threshold or alpha < 1 - alpha_tol."""
+        mask, mask2, f, g = self._mask, self._mask2, self._f, self._g
+        f.fill(0.0)
+        _add_abs2(phi, f, g)
+        _add_abs2(chi, f, g)
+        np.greater_equal(f, self.roi_threshold, out=mask)
+        np.less(alpha, 1.0 - self.alpha_tol, out=mask2)
+        mask |= mask2
+        return mask
+
+    def _update_numpy(self, alpha, phi, chi):
+        mask = self._region(alpha, phi, chi) if self._mask is not None else None
+        r = self.roughness(phi, chi)
+        f, g = self._f, self._g
+
+        # target = clip(1 - eta0 r, floor, 1)
+        np.multiply(r, -self.eta0, out=f)
+        f += 1.0
+        np.clip(f, self.floor, 1.0, out=f)
+
+        np.multiply(alpha, self._decay, out=g)
+        f *= self._gain
+        g += f
+        g += self._heal_gain
+        np.clip(g, self.floor, 1.0, out=g)
+
+        if mask is None:
+            alpha[...] = g
+            return alpha.size
+        np.copyto(alpha, g, where=mask)
+        np.logical_not(mask, out=self._mask2)
+        r[self._mask2] = 0.0
+        return int(np.count_nonzero(mask))
@@ -0,0 +1,291 @@
+"""
+hpf_walk_kernels.py
+------------------------------------------------------------
+Physics kernels for the HPF 2D gauge-metric Dirac walk
+(HPF_2D_Gauge-Metric_Walk.py).
+
+Sections 1-4 are the reference kernels: each call returns fresh arrays and is
+written for readability. Section 5 is an in-place kernel set (WalkKernels)
+for production runs:
+  - link pairs are addressed with strided views (phi[:, 0:-1:2], ...) instead
+    of np.arange fancy indexing, so nothing is gathered or scattered,
+  - the per-link couplings s = s_base * ae**p and their cos / -i sin are
+    computed once per tick and shared by both X half-steps and both Y steps,
+  - all updates go through np.multiply(..., out=) into preallocated scratch,
+    so a Strang step allocates nothing,
+  - links may be passed as hpf_walk_gauge.LinkTable (compact, conjugates
+    precomputed, identity links skipped) instead of full H x W arrays.
+
+Both sets produce the same fields (to rounding).
+------------------------------------------------------------
+"""
+
+import numpy as np
+
+# -----------------------------
+# 1) Physics kernels
+# -----------------------------
+def partial_swap_vec(u, v, s):
+    c, j = np.cos(s), -1j * np.sin(s)
+    return c * u + j * v, c * v + j * u
+
+def density(phi, chi):
+    return (np.abs(phi)**2 + np.abs(chi)**2).real
+
+def stream_x(phi, chi, alpha, Ux, s0, p, dt_scale=1.0):
+    H, W = phi.shape
+    s_base = s0 * dt_scale
+    for parity in (0, 1):
+        l = np.arange(parity, W - 1, 2)
+        r = l + 1
+        ae = np.sqrt(alpha[:, l] * alpha[:, r])
+        s = s_base * (ae ** p)
+
+        # +x rail (phi) picks up link phase on (x -> x+1)
+        phi[:, l], phi[:, r] = partial_swap_vec(phi[:, l] * Ux[:, l], phi[:, r], s)
+
+        # -x rail (chi) uses conjugate on the same link when moving backward
+        chi[:, l], chi[:, r] = partial_swap_vec(chi[:, l], chi[:, r] * np.conj(Ux[:, l]), s)
+    return phi, chi
+
+def stream_y(phi, chi, alpha, Uy, s0, p, dt_scale=1.0):
+    H, W = phi.shape
+    s_base = s0 * dt_scale
+    for parity in (0, 1):
+        d = np.arange(parity, H - 1, 2)
+        u = d + 1
+        ae = np.sqrt(alpha[d, :] * alpha[u, :])
+        s = s_base * (ae ** p)
+
+        # +y rail (phi) uses link phase on (y -> y+1)
+        phi[d, :], phi[u, :] = partial_swap_vec(phi[d, :] * Uy[d, :], phi[u, :], s)
+
+        # -y rail (chi) uses conjugate when moving backward along same link
+        chi[d, :], chi[u, :] = partial_swap_vec(chi[d, :], chi[u, :] * np.conj(Uy[d, :]), s)
+    return phi, chi
+
+def mix_step(phi, chi, alpha, theta0):
+    theta = theta0 * np.sqrt(alpha)
+    c, s = np.cos(theta), -1j * np.sin(theta)
+    return c * phi + s * chi, s * phi + c * chi
+
+# -----------------------------
+# 2) Geometry / regulator
+# -----------------------------
+def update_geometry(alpha, phi, chi, eta0=0.10, relax=0.02, heal=0.005, floor=0.02):
+    d0 = np.abs(phi - chi) ** 2
+
+    # open-boundary gradients (no wrap)
+    gx = np.zeros_like(d0.real)
+    gx[:, :-1] = (np.abs(phi[:, 1:] - phi[:, :-1])**2 + np.abs(chi[:, 1:] - chi[:, :-1])**2).real
+
+    gy = np.zeros_like(d0.real)
+    gy[:-1, :] = (np.abs(phi[1:, :] - phi[:-1, :])**2 + np.abs(chi[1:, :] - chi[:-1, :])**2).real
+
+    r = d0.real + 0.5 * (gx + gy)
+
+    # target pulls alpha down where rough, heal slowly restores toward 1
+    target = np.clip(1.0 - eta0 * r, floor, 1.0)
+    alpha_next = (1.0 - relax) * alpha + relax * target + heal * (1.0 - alpha)
+    return np.clip(alpha_next, floor, 1.0)
+
+# -----------------------------
+# 3) Boundaries
+# -----------------------------
+def make_sponge(H, W, thick=8):
+    sponge = np.ones((H, W), dtype=np.float64)
+    for i in range(thick):
+        # edge i gets mild damping; cumulative multiplication creates ramp
+        damp = 0.94 + 0.06 * np.cos(0.5 * np.pi * (i / thick))
+        sponge[i, :] *= damp
+        sponge[-1 - i, :] *= damp
+        sponge[:, i] *= damp
+        sponge[:, -1 - i] *= damp
+    return sponge
+
+def apply_open_boundaries(phi, chi, sponge):
+    return phi * sponge, chi * sponge
+
+# -----------------------------
+# 4) Diagnostics
+# -----------------------------
+def renormalize(phi, chi, eps=1e-20):
+    n = np.sqrt(np.sum(np.abs(phi)**2 + np.abs(chi)**2) + eps)
+    return phi / n, chi / n, n
+
+def com_of_density(rho, xx, yy, eps=1e-20):
+    m = rho.sum() + eps
+    com_x = (xx * rho).sum() / m
+    com_y = (yy * rho).sum() / m
+    return com_x, com_y
+
+def current_no_wrap(phi, chi):
+    # forward-difference-ish current proxy without periodic wrap
+    H, W = phi.shape
+    Jx = np.zeros((H, W), dtype=np.float64)
+    Jy = np.zeros((H, W), dtype=np.float64)
+
+    # x-links (x -> x+1)
+    Jx[:, :-1] = np.imag(np.conj(phi[:, :-1]) * phi[:, 1:] - np.conj(chi[:, :-1]) * chi[:, 1:])
+
+    # y-links (y -> y+1)
+    Jy[:-1, :] = np.imag(np.conj(phi[:-1, :]) * phi[1:, :] - np.conj(chi[:-1, :]) * chi[1:, :])
+    return Jx, Jy
+
+
+# -----------------------------
+# 5) In-place kernel set
+# -----------------------------
+def link_slices(n, axis):
+    """
+    Even/odd nearest-neighbour link pairs along `axis` as (left, right) slice
+    pairs: parity 0 -> (0,1), (2,3), ...; parity 1 -> (1,2), (3,4), ...
+    """
+    pairs = []
+    for parity in (0, 1):
+        lo = slice(parity, n - 1, 2)
+        hi = slice(parity + 1, n, 2)
+        if axis == 1:
+            pairs.append(((slice(None), lo), (slice(None), hi)))
+        else:
+            pairs.append(((lo, slice(None)), (hi, slice(None))))
+    return pairs
+
+class WalkKernels:
+    """
+    Allocation-free Strang step for fixed (H, W).
+
+    Usage per tick:
+        k.prepare(alpha, s0, p, theta0)     # couplings from current alpha
+        k.stream_x(phi, chi, Ux)            # dt_scale 0.5
+        k.stream_y(phi, chi, Uy)            # dt_scale 1.0
+        k.mix(phi, chi)
+        k.stream_y(phi, chi, Uy)
+        k.stream_x(phi, chi, Ux)
+    or simply k.strang_step(...). phi and chi are updated in place.
+    """
+
+    def __init__(self, H, W, dtype=np.complex128, dt_x=0.5, dt_y=1.0):
+        self.shape = (H, W)
+        self.dtype = np.dtype(dtype)
+        self.rdtype = np.finfo(self.dtype).dtype
+        self.dt_x = dt_x
+        self.dt_y = dt_y
+
+        self.x_links = link_slices(W, axis=1)
+        self.y_links = link_slices(H, axis=0)
+
+        # Per-link couplings: cos(s) (real) and -i sin(s) (complex), per parity
+        def coupling_bufs(links):
+            out = []
+            for l, _ in links:
+                shape = np.empty(self.shape, dtype=np.int8)[l].shape
+                out.append((np.empty(shape, self.rdtype), np.empty(shape, self.dtype)))
+            return out
+        self._cx = coupling_bufs(self.x_links)
+        self._cy = coupling_bufs(self.y_links)
+
+        # Mixing coefficients (full grid)
+        self._mc = np.empty(self.shape, self.rdtype)
+        self._mj = np.empty(self.shape, self.dtype)
+
+        # Scratch
+        self._r = np.empty(self.shape, self.rdtype)
+        self._a = np.empty(self.shape, self.dtype)
+        self._b = np.empty(self.shape, self.dtype)
+        self._t = np.empty(self.shape, self.dtype)
+        self._u = np.empty(self.shape, self.dtype)
+
+    # -- couplings ----------------------------------------------------
+    def _fill_couplings(self, alpha, links, bufs, s_base, p):
+        for (l, r), (c, j) in zip(links, bufs):
+            x = self._r[: c.shape[0], : c.shape[1]]
+            # s = s_base * sqrt(alpha_l alpha_r)**p = s_base * (alpha_l alpha_r)**(p/2)
+            np.multiply(alpha[l], alpha[r], out=x)
+            np.power(x, 0.5 * p, out=x)
+            x *= s_base
+            np.cos(x, out=c)
+            np.sin(x, out=x)
+            np.multiply(x, -1j, out=j)
+
+    def prepare(self, alpha, s0, p, theta0):
+        """Compute all couplings of one tick from the current alpha."""
+        self._fill_couplings(alpha, self.x_links, self._cx, s0 * self.dt_x, p)
+        self._fill_couplings(alpha, self.y_links, self._cy, s0 * self.dt_y, p)
+        x = self._r
+        np.sqrt(alpha, out=x)
+        x *= theta0
+        np.cos(x, out=self._mc)
+        np.sin(x, out=x)
+        np.multiply(x, -1j, out=self._mj)
+
+    # -- kernels ------------------------------------------------------
+    def _partial_swap(self, xl, xr, c, j, link_l=None, link_r=None):
+        """
+        In place: u = xl*link_l, v = xr*link_r;  xl <- c u + j v,  xr <- c v + j u.
+        """
+        shape = c.shape
+        a = self._a[: shape[0], : shape[1]]
+        t = self._t[: shape[0], : shape[1]]
+
+        if link_l is None:
+            np.copyto(a, xl)
+        else:
+            np.multiply(xl, link_l, out=a)
+        if link_r is None:
+            v = xr
+        else:
+            v = self._b[: shape[0], : shape[1]]
+            np.multiply(xr, link_r, out=v)
+
+        np.multiply(v, j, out=t)
+        np.multiply(a, c, out=xl)
+        xl += t
+
+        np.multiply(a, j, out=t)
+        np.multiply(v, c, out=xr)
+        xr += t
+
+    def _stream(self, phi, chi, U, links, bufs):
+        # U is a full link array, or a hpf_walk_gauge.LinkTable whose
+        # per-parity links and conjugates are precomputed (None = identity)
+        tables = getattr(U, "pairs", None)
+        for k, ((l, r), (c, j)) in enumerate(zip(links, bufs)):
+            if tables is not None:
+                Ul, cUl = tables[k]
+            else:
+                Ul = U[l]
+                cUl = self._u[: c.shape[0], : c.shape[1]]
+                np.conjugate(Ul, out=cUl)
+            # +rail (phi) picks up the link phase moving forward
+            self._partial_swap(phi[l], phi[r], c, j, link_l=Ul)
+            # -rail (chi) uses the conjugate on the same link moving backward
+            self._partial_swap(chi[l], chi[r], c, j, link_r=cUl)
+        return phi, chi
+
+    def stream_x(self, phi, chi, Ux):
+        return self._stream(phi, chi, Ux, self.x_links, self._cx)
+
+    def stream_y(self, phi, chi, Uy):
+        return self._stream(phi, chi, Uy, self.y_links, self._cy)
+
+    def mix(self, phi, chi):
+        a, t = self._a, self._t
+        np.copyto(a, phi)
+        np.multiply(chi, self._mj, out=t)
+        np.multiply(phi, self._mc, out=phi)
+        phi += t
+        np.multiply(a, self._mj, out=t)
+        np.multiply(chi, self._mc, out=chi)
+        chi += t
+        return phi, chi
+
+    def strang_step(self, phi, chi, alpha, Ux, Uy, s0, p, theta0):
+        """X/2 -> Y -> Mix -> Y -> X/2, in place."""
+        self.prepare(alpha, s0, p, theta0)
+        self.stream_x(phi, chi, Ux)
+        self.stream_y(phi, chi, Uy)
+        self.mix(phi, chi)
+        self.stream_y(phi, chi, Uy)
+        self.stream_x(phi, chi, Ux)
+        return phi, chi
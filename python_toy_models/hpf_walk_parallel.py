@@ -0,0 +1,278 @@
+"""
+hpf_walk_parallel.py
+------------------------------------------------------------
+Domain-decomposed, multi-process execution of the HPF 2D gauge-metric walk.
+
+The lattice is split into horizontal row strips, one worker process per
+strip. All fields live in multiprocessing.shared_memory blocks, so a worker
+reads its neighbours' boundary rows directly instead of copying halos
+through pipes; a barrier separates every phase that reads rows owned by
+another strip:
+
+    first sweep   (own rows: sponge, X/2, y-parity-0)     -- barrier
+    second sweep  (own rows + 3-row halo: Y, Mix, Y, X/2) -- barrier
+    geometry      (own rows + 1-row halo for gy)           -- barrier
+    [renorm ticks: partial norms -> shared array           -- barrier]
+
+The sweeps are those of hpf_walk_fused.FusedStrang (phi/chi double-buffered,
+sponge folded into the next tick), the geometry update is a per-strip
+GeometryRegulator. Physics is identical to WalkEngine up to summation order
+in the renormalisation.
+
+The worker processes are started by the first run() and then kept alive,
+each waiting on its own pipe for the next (t0, steps, buffer) command, until
+close(); later runs pay no process start-up or import cost.
+
+    with StripWalk(WalkConfig(H=4096, W=4096), workers=8) as walk:
+        walk.run(200)
+        d = walk.diagnostics()
+------------------------------------------------------------
+"""
+
+import multiprocessing as mp
+from multiprocessing import connection as mp_connection
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from hpf_walk_engine import Diagnostics, WalkConfig, initial_fields, measure
+from hpf_walk_fused import FusedStrang, HAVE_NUMBA, numba
+from hpf_walk_geometry import GeometryRegulator
+
+BUFFERS = ("phi0", "chi0", "phi1", "chi1", "alpha", "Ux", "Uy", "sponge")
+
+def strip_bounds(H: int, workers: int) -> List[Tuple[int, int]]:
+    """Split rows [0, H) into `workers` strips that start on even rows."""
+    if workers < 1 or H < 2 * workers:
+        raise ValueError(f"cannot split {H} rows into {workers} strips of >= 2 rows")
+    edges = [2 * ((k * H) // (2 * workers)) for k in range(workers)] + [H]
+    return list(zip(edges[:-1], edges[1:]))
+
+def _attach(specs: Dict[str, tuple]):
+    """Open the shared blocks named in specs -> (SharedMemory list, array dict)."""
+    shms, arrays = [], {}
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        shms.append(shm)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return shms, arrays
+
+def _close(shms) -> None:
+    for shm in shms:
+        try:
+            shm.close()
+        except BufferError:  # arrays still referencing the block; freed at exit
+            pass
+
+def _worker(rank, strips, specs, cfg, barrier, conn):
+    """Strip process: set up once, then run one command per (t0, steps, cur) message."""
+    if HAVE_NUMBA:
+        numba.set_num_threads(1)  # one core per strip
+    shms, f = _attach(specs)
+    try:
+        H, W = cfg.H, cfg.W
+        a, e = strips[rank]
+        g1 = min(H, e + 1)  # geometry needs one row below the strip for gy
+        sponge = f["sponge"]
+        Ux = np.broadcast_to(f["Ux"], (H, W))  # compact Landau-gauge links
+        Uy = np.broadcast_to(f["Uy"], (H, W))
+        bufs = ((f["phi0"], f["chi0"]), (f["phi1"], f["chi1"]))
+
+        cdt, rdt = cfg.field_dtypes()
+        fused = FusedStrang(H, W, dtype=cdt)
+        reg = GeometryRegulator(g1 - a, W, eta0=cfg.eta0, relax=cfg.relax, heal=cfg.heal,
+                                floor=cfg.floor, every=cfg.geometry_every,
+                                roi_threshold=cfg.geometry_roi, dtype=rdt)
+        alpha_loc = np.empty((g1 - a, W), dtype=f["alpha"].dtype)
+
+        while True:
+            cmd = conn.recv()
+            if cmd is None:
+                break
+            t0, steps, cur = cmd
+            try:
+                cur, pending = _run_strip(rank, (a, e, g1), cfg, f, bufs, Ux, Uy, fused, reg,
+                                          alpha_loc, t0, steps, cur, barrier)
+                if pending:
+                    phi, chi = bufs[cur]
+                    phi[a:e] *= sponge[a:e]
+                    chi[a:e] *= sponge[a:e]
+            except BaseException as exc:
+                barrier.abort()
+                conn.send(("error", repr(exc)))
+                raise
+            conn.send(("done", None))
+    finally:
+        _close(shms)
+
+def _run_strip(rank, rows, cfg, f, bufs, Ux, Uy, fused, reg, alpha_loc, t0, steps, cur, barrier):
+    """`steps` ticks of one strip; returns (current buffer, sponge pending)."""
+    a, e, g1 = rows
+    alpha, sponge, norms = f["alpha"], f["sponge"], f["norms"]
+    pending = False
+    for t in range(t0, t0 + steps):
+        (phi, chi), (out_phi, out_chi) = bufs[cur], bufs[1 - cur]
+        fused.first_sweep(phi, chi, alpha, Ux, Uy, cfg.s0, cfg.p_power,
+                          sponge=sponge if pending else None, rows=(a, e))
+        barrier.wait()
+        fused.second_sweep(phi, chi, alpha, Ux, Uy, out_phi, out_chi,
+                           cfg.s0, cfg.p_power, cfg.theta0, rows=(a, e))
+        barrier.wait()
+        cur = 1 - cur
+        phi, chi = out_phi, out_chi
+
+        alpha_loc[...] = alpha[a:g1]
+        reg.update(alpha_loc, phi[a:g1], chi[a:g1], t)
+        alpha[a:e] = alpha_loc[:e - a]
+        barrier.wait()
+        pending = True
+
+        if cfg.renorm_every and (t % cfg.renorm_every == 0) and t > 0:
+            phi[a:e] *= sponge[a:e]
+            chi[a:e] *= sponge[a:e]
+            pending = False
+            norms[rank] = np.sum(np.abs(phi[a:e])**2 + np.abs(chi[a:e])**2)
+            barrier.wait()
+            n = np.sqrt(norms.sum() + 1e-20)
+            phi[a:e] /= n
+            chi[a:e] /= n
+            barrier.wait()  # norms is reused on the next renorm tick
+    return cur, pending
+
+class StripWalk:
+    """
+    Owns the shared-memory fields of one run; run(steps) advances them with
+    `workers` strip processes, started on the first run() and kept until
+    close(). Fields are readable between runs.
+    """
+
+    def __init__(self, config: Optional[WalkConfig] = None, workers: int = 2,
+                 start_method: str = "spawn"):
+        self.config = cfg = config or WalkConfig()
+        # fork is unsafe once Numba's threading layer (TBB/OpenMP) is running
+        # in the parent, so workers are spawned by default
+        self._ctx = mp.get_context(start_method)
+        self.strips = strip_bounds(cfg.H, workers)
+        self.workers = workers
+        self.t = 0
+        self.com_hist = []
+        self._cur = 0
+        self._procs = []
+        self._conns = []
+        self._barrier = None
+
+        init = initial_fields(cfg)
+        init.update(phi0=init.pop("phi"), chi0=init.pop("chi"))
+        init["phi1"] = np.zeros_like(init["phi0"])
+        init["chi1"] = np.zeros_like(init["chi0"])
+        init["norms"] = np.zeros(workers, dtype=np.float64)
+
+        self._shms = []
+        self._specs: Dict[str, tuple] = {}
+        self.fields: Dict[str, np.ndarray] = {}
+        try:
+            for key in BUFFERS + ("norms",):
+                arr = init[key]
+                shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+                self._shms.append(shm)
+                view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+                view[...] = arr
+                self.fields[key] = view
+                self._specs[key] = (shm.name, arr.shape, arr.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def phi(self) -> np.ndarray:
+        return self.fields[f"phi{self._cur}"]
+
+    @property
+    def chi(self) -> np.ndarray:
+        return self.fields[f"chi{self._cur}"]
+
+    @property
+    def alpha(self) -> np.ndarray:
+        return self.fields["alpha"]
+
+    def _start(self) -> None:
+        self._barrier = self._ctx.Barrier(self.workers)
+        for rank in range(self.workers):
+            parent, child = self._ctx.Pipe()
+            p = self._ctx.Process(target=_worker,
+                                  args=(rank, self.strips, self._specs, self.config,
+                                        self._barrier, child),
+                                  daemon=True)
+            p.start()
+            child.close()
+            self._procs.append(p)
+            self._conns.append(parent)
+
+    def _stop(self, terminate: bool = False) -> None:
+        for conn, p in zip(self._conns, self._procs):
+            if not terminate:
+                try:
+                    conn.send(None)
+                except OSError:  # worker already gone
+                    pass
+            p.join(timeout=None if not terminate else 0)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+            conn.close()
+        self._procs, self._conns, self._barrier = [], [], None
+
+    def run(self, steps: int) -> None:
+        """Advance `steps` ticks with one process per strip."""
+        if not self._procs:
+            self._start()
+        for conn in self._conns:
+            conn.send((self.t, steps, self._cur))
+        # a worker that dies outside Python (e.g. killed) never aborts the
+        # barrier itself or replies; watch the exit sentinels as well
+        waiting = {conn: p for conn, p in zip(self._conns, self._procs)}
+        sentinels = {p.sentinel: p for p in self._procs}
+        errors = []
+        while waiting:
+            for ready in mp_connection.wait(list(waiting) + list(sentinels)):
+                if ready in sentinels:
+                    p = sentinels.pop(ready)
+                    p.join()
+                    errors.append(f"worker exited with code {p.exitcode}")
+                    self._barrier.abort()
+                    waiting = {c: q for c, q in waiting.items() if q is not p}
+                elif ready in waiting:
+                    try:
+                        status, info = ready.recv()
+                    except EOFError:
+                        continue  # reported through its sentinel
+                    del waiting[ready]
+                    if status != "done":
+                        errors.append(info)
+        if errors:
+            self._stop(terminate=True)
+            raise RuntimeError(f"strip worker failed: {'; '.join(errors)}")
+        self.t += steps
+        self._cur ^= steps % 2
+
+    def diagnostics(self) -> Diagnostics:
+        """Diagnostics of the current fields, labelled with the last tick run."""
+        cfg = self.config
+        yy, xx = np.mgrid[0:cfg.H, 0:cfg.W]
+        return measure(cfg, self.t - 1, self.phi, self.chi, self.alpha, xx, yy, self.com_hist)
+
+    def close(self) -> None:
+        if self._procs:
+            self._stop()
+        self.fields = {}
+        _close(self._shms)
+        for shm in self._shms:
+            shm.unlink()
+        self._shms = []
+
+    def __enter__(self) -> "StripWalk":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
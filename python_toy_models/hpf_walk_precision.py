@@ -0,0 +1,141 @@
+"""
+hpf_walk_precision.py
+------------------------------------------------------------
+Accuracy tracking for single-precision runs of the HPF 2D gauge-metric walk.
+
+WalkConfig(dtype="complex64") runs the whole pipeline (phi, chi, links in
+complex64; alpha, sponge in float32), halving memory and bandwidth. Whether
+that is acceptable depends on the experiment, so ShadowRun advances a
+float64 shadow engine in lockstep with the float32 one and, every
+`compare_every` ticks, records
+
+    norm_drift  |norm_32 - norm_64| / norm_64
+    com_dev     distance between the two centres of mass (lattice units)
+    alpha_dev   max |alpha_32 - alpha_64|
+    field_dev   max |phi_32 - phi_64| + max |chi_32 - chi_64|, relative to
+                max |phi_64| + max |chi_64|
+
+together with the time spent in each engine, so the speed gained and the
+accuracy lost can be read off one report.
+
+    run = ShadowRun(WalkConfig(dtype="complex64"), compare_every=20)
+    for d in run.run():       # float32 diagnostics, as WalkEngine.run()
+        ...
+    print(format_report(run.report()))
+
+Usage:
+    python hpf_walk_precision.py
+------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, replace
+import time
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from hpf_walk_engine import Diagnostics, WalkConfig, WalkEngine
+from hpf_walk_kernels import com_of_density, density
+
+@dataclass
+class ShadowComparison:
+    t: int
+    norm: float
+    norm_shadow: float
+    norm_drift: float
+    com_dev: float
+    alpha_dev: float
+    field_dev: float
+
+def compare(engine: WalkEngine, shadow: WalkEngine, t: int) -> ShadowComparison:
+    """Compare the fields of two engines at the same tick."""
+    engine.settle()
+    shadow.settle()
+    rho = density(engine.phi, engine.chi).astype(np.float64)
+    rho_s = density(shadow.phi, shadow.chi)
+    com = np.array(com_of_density(rho, engine.xx, engine.yy))
+    com_s = np.array(com_of_density(rho_s, shadow.xx, shadow.yy))
+    norm, norm_s = float(rho.sum()), float(rho_s.sum())
+    scale = np.abs(shadow.phi).max() + np.abs(shadow.chi).max()
+    field_dev = np.abs(engine.phi - shadow.phi).max() + np.abs(engine.chi - shadow.chi).max()
+    return ShadowComparison(
+        t=t,
+        norm=norm,
+        norm_shadow=norm_s,
+        norm_drift=abs(norm - norm_s) / norm_s if norm_s else 0.0,
+        com_dev=float(np.hypot(*(com - com_s))),
+        alpha_dev=float(np.abs(engine.alpha.astype(np.float64) - shadow.alpha).max()),
+        field_dev=float(field_dev / scale) if scale else 0.0,
+    )
+
+class ShadowRun:
+    """A reduced-precision WalkEngine with a float64 shadow run alongside."""
+
+    def __init__(self, config: Optional[WalkConfig] = None, compare_every: int = 50):
+        if compare_every < 1:
+            raise ValueError("compare_every must be >= 1")
+        config = config or WalkConfig(dtype="complex64")
+        self.engine = WalkEngine(config)
+        self.shadow = WalkEngine(replace(config, dtype="complex128", snapshot=False,
+                                         with_current=False))
+        self.compare_every = compare_every
+        self.records: List[ShadowComparison] = []
+        self.seconds = 0.0
+        self.seconds_shadow = 0.0
+
+    def step(self) -> None:
+        t = self.engine.t
+        t0 = time.perf_counter()
+        self.engine.step()
+        t1 = time.perf_counter()
+        self.shadow.step()
+        self.seconds += t1 - t0
+        self.seconds_shadow += time.perf_counter() - t1
+        if t % self.compare_every == 0:
+            self.records.append(compare(self.engine, self.shadow, t))
+
+    def run(self, steps: Optional[int] = None) -> Iterator[Diagnostics]:
+        """Advance both engines, yielding the reduced-precision diagnostics."""
+        steps = self.engine.config.steps if steps is None else steps
+        every = self.engine.config.diag_every
+        for _ in range(steps):
+            t = self.engine.t
+            self.step()
+            if every and t % every == 0:
+                yield self.engine.diagnostics(t)
+
+    def report(self) -> dict:
+        """Worst and final deviations over all comparisons, plus timings."""
+        out = {
+            "dtype": self.engine.config.dtype,
+            "ticks": self.engine.t,
+            "comparisons": len(self.records),
+            "seconds": self.seconds,
+            "seconds_shadow": self.seconds_shadow,
+            "speedup": self.seconds_shadow / self.seconds if self.seconds else float("nan"),
+        }
+        for key in ("norm_drift", "com_dev", "alpha_dev", "field_dev"):
+            values = [getattr(r, key) for r in self.records]
+            out[f"max_{key}"] = max(values, default=0.0)
+            out[f"final_{key}"] = values[-1] if values else 0.0
+        return out
+
+def format_report(rep: dict) -> str:
+    return "\n".join([
+        f"{rep['dtype']} vs complex128 over {rep['ticks']} ticks ({rep['comparisons']} comparisons)",
+        f"  time       {rep['seconds']:.2f} s vs {rep['seconds_shadow']:.2f} s  ({rep['speedup']:.2f}x)",
+        f"  norm drift max {rep['max_norm_drift']:.2e}  final {rep['final_norm_drift']:.2e}",
+        f"  COM dev    max {rep['max_com_dev']:.2e}  final {rep['final_com_dev']:.2e}",
+        f"  alpha dev  max {rep['max_alpha_dev']:.2e}  final {rep['final_alpha_dev']:.2e}",
+        f"  field dev  max {rep['max_field_dev']:.2e}  final {rep['final_field_dev']:.2e}",
+    ])
+
+def main():
+    run = ShadowRun(WalkConfig(H=256, W=384, steps=450, dtype="complex64", snapshot=False),
+                    compare_every=20)
+    for _ in run.run():
+        pass
+    print(format_report(run.report()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+hpf_walk_snapshots.py
+------------------------------------------------------------
+Chunked, append-only field snapshots for the HPF 2D gauge-metric walk.
+
+Layout of a snapshot directory:
+
+    meta.json                 run parameters (WalkConfig.as_dict() of the engine
+                              passed to record(), plus any caller meta),
+                              field dtypes/shapes, chunk index
+    phi_000000.npy            frames [0, chunk_frames) of phi, shape (F, H, W)
+    alpha_000000.npy          ...
+    phi_000001.npy            next chunk, ...
+
+or, with compress=True, one chunk_000000.npz (zip-deflated) holding every
+field of that chunk.
+
+Writing: each frame is copied straight into a memory-mapped .npy chunk file
+(np.lib.format.open_memmap; a hidden staging file when compressing), so the
+writer holds no frames in RAM whatever chunk_frames is. When the chunk fills
+(or on close) it is finalised and meta.json is rewritten with the new chunk
+appended. A crashed run therefore keeps every completed chunk.
+
+Reading: SnapshotReader memory-maps individual .npy chunks on demand, so
+frame(i, "phi") touches only that frame's pages; .npz chunks are decompressed
+one chunk at a time (the most recent one is kept).
+------------------------------------------------------------
+"""
+
+import json
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from hpf_walk_kernels import current_no_wrap
+
+DEFAULT_FIELDS = ("phi", "chi", "alpha", "Jx", "Jy")
+
+def engine_fields(engine, names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Pick fields from a WalkEngine; Jx/Jy are computed on demand."""
+    engine.settle()
+    out = {}
+    if "Jx" in names or "Jy" in names:
+        out["Jx"], out["Jy"] = current_no_wrap(engine.phi, engine.chi)
+    for name in names:
+        if name not in out:
+            out[name] = getattr(engine, name)
+    return {name: out[name] for name in names}
+
+class SnapshotWriter:
+    """
+    directory:    output directory (created; must not already hold a run)
+    fields:       names of fields to store
+    every:        store a frame when t % every == 0
+    chunk_frames: frames per chunk file
+    compress:     write zip-compressed .npz chunks instead of raw .npy
+    meta:         extra run parameters stored in meta.json; record() adds the
+                  engine's WalkConfig.as_dict() on its first call
+    """
+
+    def __init__(self, directory: str,
+                 fields: Sequence[str] = DEFAULT_FIELDS,
+                 every: int = 20,
+                 chunk_frames: int = 32,
+                 compress: bool = False,
+                 meta: Optional[dict] = None):
+        if every < 1 or chunk_frames < 1:
+            raise ValueError("every and chunk_frames must be >= 1")
+        if os.path.exists(os.path.join(directory, "meta.json")):
+            raise FileExistsError(f"{directory} already contains a snapshot run")
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.fields = list(fields)
+        self.every = every
+        self.chunk_frames = chunk_frames
+        self.compress = compress
+        self.params = dict(meta or {})
+        self._have_config = False
+
+        self._specs: Dict[str, dict] = {}
+        self._buf: Dict[str, np.memmap] = {}
+        self._buf_t = []
+        self._chunks = []
+        self.closed = False
+        self._write_meta()
+
+    def due(self, t: int) -> bool:
+        return t % self.every == 0
+
+    def write(self, t: int, **fields: np.ndarray) -> None:
+        """Append one frame (all configured fields) labelled with tick t."""
+        if self.closed:
+            raise ValueError("writer is closed")
+        missing = set(self.fields) - set(fields)
+        if missing:
+            raise ValueError(f"Missing fields: {sorted(missing)}")
+
+        k = len(self._buf_t)
+        for name in self.fields:
+            arr = np.asarray(fields[name])
+            if name not in self._specs:
+                self._specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape)}
+            if name not in self._buf:
+                self._buf[name] = np.lib.format.open_memmap(
+                    self._stage_path(name), mode="w+", dtype=arr.dtype,
+                    shape=(self.chunk_frames,) + arr.shape)
+            self._buf[name][k] = arr
+        self._buf_t.append(int(t))
+
+        if len(self._buf_t) == self.chunk_frames:
+            self._flush_chunk()
+
+    def record(self, engine, t: Optional[int] = None) -> bool:
+        """Write a frame from a WalkEngine if tick t is due; returns True if written."""
+        if not self._have_config:
+            self._have_config = True
+            self.params = dict(engine.config.as_dict(), **self.params)
+            self._write_meta()
+        t = engine.t - 1 if t is None else t
+        if not self.due(t):
+            return False
+        self.write(t, **engine_fields(engine, self.fields))
+        return True
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self._buf_t:
+            self._flush_chunk()
+        self.closed = True
+        self._write_meta()
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _stage_path(self, field: str) -> str:
+        """Memory-mapped file the current chunk of `field` is written into."""
+        idx = len(self._chunks)
+        if self.compress:
+            return os.path.join(self.directory, f".{field}_{idx:06d}.npy.part")
+        return os.path.join(self.directory, f"{field}_{idx:06d}.npy")
+
+    def _flush_chunk(self) -> None:
+        n = len(self._buf_t)
+        idx = len(self._chunks)
+        staged = {f: self._stage_path(f) for f in self.fields}
+        for mm in self._buf.values():
+            mm.flush()
+        if self.compress:
+            name = f"chunk_{idx:06d}.npz"
+            np.savez_compressed(os.path.join(self.directory, name),
+                                **{f: self._buf[f][:n] for f in self.fields})
+            self._buf = {}
+            for path in staged.values():
+                os.remove(path)
+        else:
+            name = f"{{field}}_{idx:06d}.npy"
+            short = n < self.chunk_frames
+            if short:  # last chunk: trim the files to n frames
+                for f, path in staged.items():
+                    with open(path + ".tmp", "wb") as out:
+                        np.lib.format.write_array(out, self._buf[f][:n])
+            self._buf = {}  # unmap before replacing / removing the files
+            if short:
+                for path in staged.values():
+                    os.replace(path + ".tmp", path)
+        self._chunks.append({"file": name, "t": list(self._buf_t)})
+        self._buf_t = []
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        meta = {
+            "params": self.params,
+            "fields": self.fields,
+            "specs": self._specs,
+            "every": self.every,
+            "chunk_frames": self.chunk_frames,
+            "compress": self.compress,
+            "chunks": self._chunks,
+            "complete": self.closed,
+        }
+        path = os.path.join(self.directory, "meta.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2, default=float)
+        os.replace(tmp, path)
+
+class SnapshotReader:
+    """Lazy reader for a SnapshotWriter directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.params = self.meta["params"]
+        self.fields = self.meta["fields"]
+        self._index = []  # frame -> (chunk, position in chunk)
+        for c, chunk in enumerate(self.meta["chunks"]):
+            self._index += [(c, k) for k in range(len(chunk["t"]))]
+        self.times = np.array([t for chunk in self.meta["chunks"] for t in chunk["t"]], dtype=np.int64)
+        self._cached = (None, None)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _chunk(self, c: int, field: str) -> np.ndarray:
+        name = self.meta["chunks"][c]["file"]
+        if not self.meta["compress"]:
+            return np.load(os.path.join(self.directory, name.format(field=field)), mmap_mode="r")
+        if self._cached[0] != c:
+            with np.load(os.path.join(self.directory, name)) as z:
+                self._cached = (c, {f: z[f] for f in self.fields})
+        return self._cached[1][field]
+
+    def frame(self, i: int, field: str) -> np.ndarray:
+        """Frame i of one field (a read-only memory-mapped view when uncompressed)."""
+        if field not in self.fields:
+            raise KeyError(field)
+        c, k = self._index[i]
+        return self._chunk(c, field)[k]
+
+    def frame_at(self, t: int, field: str) -> np.ndarray:
+        """Frame recorded at tick t."""
+        hits = np.nonzero(self.times == t)[0]
+        if len(hits) == 0:
+            raise KeyError(f"no frame at t={t}")
+        return self.frame(int(hits[0]), field)
+
+    def iter_frames(self, field: str):
+        for i in range(len(self)):
+            yield int(self.times[i]), self.frame(i, field)
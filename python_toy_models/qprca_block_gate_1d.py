@@ -34,10 +34,10 @@ control-free and even cleaner.
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple, Union
 
 import numpy as np
+import scipy.sparse as sp
 from qutip import Qobj, qeye, tensor
 from qutip.qip.operations import (
     hadamard_transform as H_gate,
@@ -49,6 +49,20 @@ from qutip.qip.operations import (
     ry,
 )
 
+from qprca_layout import Layout1D  # re-exported; the layout itself is qutip-free
+from qprca_gates import (
+    Gate,
+    GateList,
+    overlap_probe_gates,
+    stream_pair_gates,
+    stream_1d_gates,
+    mix_site_gates,
+    mix_all_gates,
+    relax_all_gates,
+    ren_all_gates,
+    tick_gates,
+)
+
 # -------------------------
 # Utility: basis operators
 # -------------------------
@@ -71,51 +85,21 @@ def SWAP() -> Qobj:
 def CNOT() -> Qobj:
     return cnot()
 
+def U_rm_gate(lambda_mix: float) -> Qobj:
+    """Two-qubit (R,M) mixing unitary exp(-i * lambda * (XX+YY)/2)."""
+    # iSWAP^lambda up to phases. We build the XX+YY Hamiltonian explicitly.
+    sx = Qobj(np.array([[0, 1], [1, 0]], dtype=complex))
+    sy = Qobj(np.array([[0, -1j], [1j, 0]], dtype=complex))
+    H_xy = (tensor(sx, sx) + tensor(sy, sy)) / 2.0
+    return (-1j * lambda_mix * H_xy).expm()
+
 def CSWAP() -> Qobj:
     """Controlled-SWAP (Fredkin) as a 3-qubit gate."""
-    # Build CSWAP from a controlled SWAP on the last two qubits
-    # qutip's controlled_gate controls the first qubit by default.
-    return controlled_gate(SWAP())
-
-# -------------------------
-# Indexing convention
-# -------------------------
-
-@dataclass(frozen=True)
-class Layout1D:
-    """
-    Qubit ordering in the total Hilbert space:
-
-    [ D_0, R_0, M_0,  D_1, R_1, M_1,  ... ,  D_{N-1}, R_{N-1}, M_{N-1},  A ]
-
-    If use_reservoir=False, we omit M_i, and layout becomes:
-    [ D_0, R_0,  D_1, R_1, ... , D_{N-1}, R_{N-1},  A ]
-    """
-    N: int
-    use_reservoir: bool = True
-
-    def idx_D(self, i: int) -> int:
-        if self.use_reservoir:
-            return 3 * i + 0
-        return 2 * i + 0
-
-    def idx_R(self, i: int) -> int:
-        if self.use_reservoir:
-            return 3 * i + 1
-        return 2 * i + 1
-
-    def idx_M(self, i: int) -> int:
-        if not self.use_reservoir:
-            raise ValueError("Reservoir disabled; no M index.")
-        return 3 * i + 2
-
-    @property
-    def idx_A(self) -> int:
-        return (3 * self.N) if self.use_reservoir else (2 * self.N)
-
-    @property
-    def n_qubits(self) -> int:
-        return self.idx_A + 1
+    # Control on the first qubit, swap the last two: |101> <-> |110>.
+    # (qutip's controlled_gate only handles single-qubit targets here.)
+    U = np.eye(8, dtype=complex)
+    U[[5, 6]] = U[[6, 5]]
+    return Qobj(U, dims=[[2, 2, 2], [2, 2, 2]])
 
 # -------------------------
 # Gate expansion helpers
@@ -125,7 +109,7 @@ def expand_1(layout: Layout1D, gate1: Qobj, target: int) -> Qobj:
     return gate_expand_1toN(gate1, layout.n_qubits, target)
 
 def expand_2(layout: Layout1D, gate2: Qobj, targets: Tuple[int, int]) -> Qobj:
-    return gate_expand_2toN(gate2, layout.n_qubits, targets)
+    return gate_expand_2toN(gate2, layout.n_qubits, targets=list(targets))
 
 def expand_3(layout: Layout1D, gate3: Qobj, targets: Tuple[int, int, int]) -> Qobj:
     # qutip has no direct expand_3 helper; do manual tensor placement
@@ -137,7 +121,8 @@ def expand_3(layout: Layout1D, gate3: Qobj, targets: Tuple[int, int, int]) -> Qo
 # Core: overlap probe (swap-test-like) between D_i and D_j into A
 # -------------------------
 
-def overlap_probe_U(layout: Layout1D, i: int, j: int) -> Qobj:
+def overlap_probe_U(layout: Layout1D, i: int, j: int,
+                    as_gates: bool = False) -> Union[Qobj, GateList]:
     """
     Unitary probe that correlates ancilla A with overlap between D_i and D_j.
 
@@ -145,7 +130,12 @@ def overlap_probe_U(layout: Layout1D, i: int, j: int) -> Qobj:
       H(A) -> CSWAP(A, D_i, D_j) -> H(A)
 
     This is unitary and reversible; no measurement.
+
+    With as_gates=True, return the flat gate list (qprca_gates) instead.
     """
+    if as_gates:
+        return overlap_probe_gates(layout, i, j)
+
     A = layout.idx_A
     Di = layout.idx_D(i)
     Dj = layout.idx_D(j)
@@ -174,10 +164,56 @@ def embed_3q_gate(layout: Layout1D, gate3: Qobj, qubits: Tuple[int, int, int]) -
     """
     Embed a 3-qubit gate onto arbitrary qubit indices.
 
-    This uses qutip's tensor permutation: create full operator as I⊗...⊗gate⊗...⊗I
-    with gate placed on the *last* 3 qubits, then permute into position.
+    The sparse operator is built directly in the target ordering: every
+    nonzero g[r, c] of the 8x8 gate maps each basis state whose bits on
+    (q0, q1, q2) read c to the same state with those bits rewritten to r.
+    The operator is assembled column by column in one vectorised pass; for a
+    permutation gate such as CSWAP it is a single index permutation, so the
+    cost is O(nnz(gate) * 2^n / 8) with no full-size intermediate.
 
-    This is robust and explicit (inspection-friendly).
+    Qubit q0 is the most significant bit of the gate's local index.
+    """
+    n = layout.n_qubits
+    q0, q1, q2 = qubits
+    if len({q0, q1, q2}) != 3:
+        raise ValueError("Qubits must be distinct for 3q gate embedding.")
+
+    g = gate3.full() if isinstance(gate3, Qobj) else np.asarray(gate3)
+    shifts = [n - 1 - q for q in (q0, q1, q2)]
+
+    # Local 3-bit index of every basis state, and the state with those bits cleared
+    idx = np.arange(2 ** n, dtype=np.int64)
+    local = np.zeros_like(idx)
+    for s in shifts:
+        local = (local << 1) | ((idx >> s) & 1)
+    base = idx & ~sum(1 << s for s in shifts)
+
+    # Gate nonzeros grouped by local column, with their rows scattered to (q0,q1,q2)
+    R, C = np.nonzero(g)
+    order = np.argsort(C, kind="stable")
+    R, C = R[order], C[order]
+    vals = g[R, C].astype(complex)
+    enc = np.zeros(8, dtype=np.int64)
+    for k, s in enumerate(shifts):
+        enc |= ((np.arange(8) >> (2 - k)) & 1) << s
+    counts = np.bincount(C, minlength=8)
+    first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # One CSC column per basis state; column b holds the nonzeros of g[:, local[b]]
+    per_col = counts[local]
+    indptr = np.concatenate(([0], np.cumsum(per_col)))
+    nz = np.repeat(first[local] - indptr[:-1], per_col) + np.arange(indptr[-1])
+    rows = np.repeat(base, per_col) | enc[R[nz]]
+
+    U = sp.csc_matrix((vals[nz], rows, indptr), shape=(2 ** n, 2 ** n)).tocsr()
+    return Qobj(U, dims=[[2] * n, [2] * n])
+
+def embed_3q_gate_permute(layout: Layout1D, gate3: Qobj, qubits: Tuple[int, int, int]) -> Qobj:
+    """
+    Reference embedding via qutip's tensor permutation (kept for benchmarks).
+
+    Create full operator as I⊗...⊗gate⊗...⊗I with gate placed on the *last*
+    3 qubits, then permute into position. Copies the full operator.
     """
     n = layout.n_qubits
     q0, q1, q2 = qubits
@@ -228,7 +264,8 @@ def regulator_integrate_from_A(layout: Layout1D, i: int, eta0: float) -> Qobj:
 # Streaming (1D) with ancilla-decoupled control
 # -------------------------
 
-def stream_pair_unitary(layout: Layout1D, i: int, j: int, direction: str) -> Qobj:
+def stream_pair_unitary(layout: Layout1D, i: int, j: int, direction: str,
+                        as_gates: bool = False) -> Union[Qobj, GateList]:
     """
     Stream between neighboring sites i and j (j = i+1 mod N).
 
@@ -245,7 +282,12 @@ def stream_pair_unitary(layout: Layout1D, i: int, j: int, direction: str) -> Qob
     direction:
       "R": condition on D_i == 0  (right-moving at i)
       "L": condition on D_j == 1  (left-moving at j)
+
+    With as_gates=True, return the flat gate list (qprca_gates) instead.
     """
+    if as_gates:
+        return stream_pair_gates(layout, i, j, direction)
+
     A = layout.idx_A
     Di = layout.idx_D(i)
     Dj = layout.idx_D(j)
@@ -277,7 +319,7 @@ def stream_pair_unitary(layout: Layout1D, i: int, j: int, direction: str) -> Qob
 
     return U
 
-def U_stream_1d(layout: Layout1D) -> Qobj:
+def U_stream_1d(layout: Layout1D, as_gates: bool = False) -> Union[Qobj, GateList]:
     """
     One streaming layer for the whole lattice in 1D.
     For N=2, there is a single pair (0,1). For N>2, you would apply disjoint
@@ -286,6 +328,9 @@ def U_stream_1d(layout: Layout1D) -> Qobj:
     This reference applies streaming on disjoint pairs (0,1), (2,3), ...
     then you can call again with shifted pairing for the next partition.
     """
+    if as_gates:
+        return stream_1d_gates(layout)
+
     U = qeye(2 ** layout.n_qubits)
     N = layout.N
     for i in range(0, N, 2):
@@ -299,14 +344,20 @@ def U_stream_1d(layout: Layout1D) -> Qobj:
 # Mixing (Dirac coin/mass) controlled by regulator
 # -------------------------
 
-def U_mix_site(layout: Layout1D, i: int, theta: float, theta_drag: float) -> Qobj:
+def U_mix_site(layout: Layout1D, i: int, theta: float, theta_drag: float,
+               as_gates: bool = False) -> Union[Qobj, GateList]:
     """
     Apply a "coin/mass" rotation on D_i.
     If R_i=0: apply Ry(theta)
     If R_i=1: apply Ry(theta_drag)
 
     This is a toy stand-in for exp(-i theta beta) on a 4D Dirac spinor.
+
+    With as_gates=True, return the flat gate list (qprca_gates) instead.
     """
+    if as_gates:
+        return mix_site_gates(layout, i, theta, theta_drag)
+
     Di = layout.idx_D(i)
     Ri = layout.idx_R(i)
 
@@ -324,7 +375,10 @@ def U_mix_site(layout: Layout1D, i: int, theta: float, theta_drag: float) -> Qob
 
     return U
 
-def U_mix_all(layout: Layout1D, theta: float, theta_drag: float) -> Qobj:
+def U_mix_all(layout: Layout1D, theta: float, theta_drag: float,
+              as_gates: bool = False) -> Union[Qobj, GateList]:
+    if as_gates:
+        return mix_all_gates(layout, theta, theta_drag)
     U = qeye(2 ** layout.n_qubits)
     for i in range(layout.N):
         U = U_mix_site(layout, i, theta, theta_drag) * U
@@ -334,7 +388,8 @@ def U_mix_all(layout: Layout1D, theta: float, theta_drag: float) -> Qobj:
 # Reversible relaxation via reservoir (optional)
 # -------------------------
 
-def U_relax_all(layout: Layout1D, lambda_mix: float, mu_scramble: float) -> Qobj:
+def U_relax_all(layout: Layout1D, lambda_mix: float, mu_scramble: float,
+                as_gates: bool = False) -> Union[Qobj, GateList]:
     """
     Reversible "relaxation" is implemented by coupling R_i <-> M_i unitary.
 
@@ -342,18 +397,17 @@ def U_relax_all(layout: Layout1D, lambda_mix: float, mu_scramble: float) -> Qobj
       - partial swap between R and M via exp(-i * lambda * (XX+YY)/2) (iSWAP-like)
       - optional scramble (Ry) on M to prevent perfect recording
 
-    If reservoir disabled, returns identity.
+    If reservoir disabled, returns identity (or an empty gate list).
+
+    With as_gates=True, return the flat gate list (qprca_gates) instead.
     """
+    if as_gates:
+        return relax_all_gates(layout, lambda_mix, mu_scramble)
+
     if not layout.use_reservoir:
         return qeye(2 ** layout.n_qubits)
 
-    # Two-qubit mixing unitary on (R,M):
-    # U_rm = exp(-i * lambda * (XX+YY)/2) is iSWAP^lambda up to phases.
-    # We'll build XX+YY Hamiltonian explicitly.
-    sx = Qobj(np.array([[0, 1], [1, 0]], dtype=complex))
-    sy = Qobj(np.array([[0, -1j], [1j, 0]], dtype=complex))
-    H_xy = (tensor(sx, sx) + tensor(sy, sy)) / 2.0
-    U_rm = (-1j * lambda_mix * H_xy).expm()
+    U_rm = U_rm_gate(lambda_mix)
 
     U = qeye(2 ** layout.n_qubits)
     for i in range(layout.N):
@@ -369,11 +423,18 @@ def U_relax_all(layout: Layout1D, lambda_mix: float, mu_scramble: float) -> Qobj
 # (order chosen for convenience; keep consistent in experiments)
 # -------------------------
 
-def U_ren_all(layout: Layout1D, eta0: float) -> Qobj:
+def U_ren_all(layout: Layout1D, eta0: float,
+              as_gates: bool = False) -> Union[Qobj, GateList]:
     """
     For 1D nearest neighbors in a single block pairing:
       probe (D_i, D_{i+1}) -> integrate into R_i (forward-only)
+
+    With as_gates=True, return the flat gate list (qprca_gates) instead;
+    qprca_gates.fuse() removes the redundant H(A) pairs between probes.
     """
+    if as_gates:
+        return ren_all_gates(layout, eta0)
+
     U = qeye(2 ** layout.n_qubits)
     N = layout.N
     for i in range(0, N, 2):
@@ -389,13 +450,51 @@ def U_tick(layout: Layout1D,
            theta: float,
            theta_drag: float,
            lambda_mix: float = 0.0,
-           mu_scramble: float = 0.0) -> Qobj:
+           mu_scramble: float = 0.0,
+           as_gates: bool = False) -> Union[Qobj, GateList]:
     """
     One full tick.
+
+    With as_gates=True, return the uncompiled gate list of the tick; use
+    qprca_gates.compile_tick() for the fused version.
     """
+    if as_gates:
+        return tick_gates(layout, eta0, theta, theta_drag, lambda_mix, mu_scramble)
+
     U = qeye(2 ** layout.n_qubits)
     U = U_ren_all(layout, eta0) * U
     U = U_stream_1d(layout) * U
     U = U_mix_all(layout, theta, theta_drag) * U
     U = U_relax_all(layout, lambda_mix, mu_scramble) * U
     return U
+
+# -------------------------
+# Gate-list executor (see qprca_gates.py)
+# -------------------------
+
+def U_from_gates(layout: Layout1D, gates: Sequence[Gate]) -> Qobj:
+    """
+    Multiply a (possibly fused) gate list into a single operator.
+    """
+    n = layout.n_qubits
+    U = qeye([2] * n)
+    for g in gates:
+        q = g.qubits
+        if g.kind == "H":
+            G = expand_1(layout, H(), q[0])
+        elif g.kind == "X":
+            G = expand_1(layout, X(), q[0])
+        elif g.kind == "RY":
+            G = expand_1(layout, Ry(g.angle), q[0])
+        elif g.kind == "CNOT":
+            G = expand_2(layout, CNOT(), (q[0], q[1]))
+        elif g.kind == "CRY":
+            G = expand_2(layout, controlled_gate(Ry(g.angle)), (q[0], q[1]))
+        elif g.kind == "CSWAP":
+            G = embed_3q_gate(layout, CSWAP(), (q[0], q[1], q[2]))
+        elif g.kind == "RM":
+            G = expand_2(layout, U_rm_gate(g.angle), (q[0], q[1]))
+        else:
+            raise ValueError(f"Unsupported gate kind: {g.kind!r}")
+        U = G * U
+    return U
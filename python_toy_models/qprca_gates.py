@@ -0,0 +1,231 @@
+"""
+qprca_gates.py
+------------------------------------------------------------
+Flat gate-list intermediate representation for QPRCA ticks.
+
+The builders in qprca_block_gate_1d.py multiply their gates into a single
+operator, which hides the tick structure and ties it to qutip. Here the same
+constructions are emitted as a flat list of Gate records
+
+    Gate(kind, qubits, angle)
+
+that can be serialised, compiled once (fuse()) and then executed by any
+backend:
+
+  - qutip:      qprca_block_gate_1d.U_from_gates(layout, gates)
+  - NumPy:      qprca_statevector.apply_gates(layout, psi, gates)
+
+Gate kinds (qubit order in brackets, first qubit = most significant):
+  H [q], X [q], RY [q] (angle), CNOT [c, t], CRY [c, t] (angle),
+  CSWAP [c, a, b], RM [r, m] (angle = lambda of exp(-i lambda (XX+YY)/2))
+
+fuse() is a peephole pass that only uses exact identities:
+  - zero-angle rotations are dropped,
+  - X.X, H.H, CNOT.CNOT, CSWAP.CSWAP (same qubits) cancel,
+  - RY.RY, CRY.CRY, RM.RM on the same qubits merge (angles add),
+  - gates on disjoint qubits commute, so "adjacent" means adjacent on the
+    qubits involved, not in the list.
+In U_ren_all this removes the H(A).H(A) pair between consecutive probes and,
+when eta0 == 0, the whole probe/uncompute pair.
+
+This module is qutip-free on purpose.
+------------------------------------------------------------
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+import json
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from qprca_layout import Layout1D
+
+GATE_ARITY = {
+    "H": 1, "X": 1, "RY": 1,
+    "CNOT": 2, "CRY": 2, "RM": 2,
+    "CSWAP": 3,
+}
+
+ROTATIONS = ("RY", "CRY", "RM")
+SELF_INVERSE = ("H", "X", "CNOT", "CSWAP")
+
+@dataclass(frozen=True)
+class Gate:
+    kind: str
+    qubits: Tuple[int, ...]
+    angle: Optional[float] = None
+
+    def __post_init__(self):
+        if self.kind not in GATE_ARITY:
+            raise ValueError(f"Unknown gate kind: {self.kind!r}")
+        if len(self.qubits) != GATE_ARITY[self.kind]:
+            raise ValueError(f"{self.kind} acts on {GATE_ARITY[self.kind]} qubit(s), got {self.qubits}")
+        if len(set(self.qubits)) != len(self.qubits):
+            raise ValueError("Gate qubits must be distinct.")
+        if (self.angle is None) == (self.kind in ROTATIONS):
+            raise ValueError(f"{self.kind} {'needs' if self.kind in ROTATIONS else 'takes no'} angle")
+
+GateList = List[Gate]
+
+# -------------------------
+# Serialisation
+# -------------------------
+
+def gates_to_records(gates: Sequence[Gate]) -> list:
+    return [[g.kind, list(g.qubits), g.angle] for g in gates]
+
+def gates_from_records(records: Sequence) -> GateList:
+    return [Gate(kind, tuple(qubits), None if angle is None else float(angle))
+            for kind, qubits, angle in records]
+
+def gates_to_json(gates: Sequence[Gate]) -> str:
+    return json.dumps(gates_to_records(gates))
+
+def gates_from_json(text: str) -> GateList:
+    return gates_from_records(json.loads(text))
+
+# -------------------------
+# Builders (same constructions as qprca_block_gate_1d)
+# -------------------------
+
+def overlap_probe_gates(layout: Layout1D, i: int, j: int) -> GateList:
+    A = layout.idx_A
+    return [
+        Gate("H", (A,)),
+        Gate("CSWAP", (A, layout.idx_D(i), layout.idx_D(j))),
+        Gate("H", (A,)),
+    ]
+
+def regulator_integrate_gates(layout: Layout1D, i: int, eta0: float) -> GateList:
+    return [Gate("CRY", (layout.idx_A, layout.idx_R(i)), float(eta0))]
+
+def stream_pair_gates(layout: Layout1D, i: int, j: int, direction: str) -> GateList:
+    A = layout.idx_A
+    Di = layout.idx_D(i)
+    Dj = layout.idx_D(j)
+
+    if direction == "R":
+        compute = [Gate("X", (Di,)), Gate("CNOT", (Di, A)), Gate("X", (Di,))]
+    elif direction == "L":
+        compute = [Gate("CNOT", (Dj, A))]
+    else:
+        raise ValueError("direction must be 'R' or 'L'")
+
+    return compute + [Gate("CSWAP", (A, Di, Dj))] + compute
+
+def stream_1d_gates(layout: Layout1D) -> GateList:
+    gates: GateList = []
+    N = layout.N
+    for i in range(0, N, 2):
+        j = (i + 1) % N
+        gates += stream_pair_gates(layout, i, j, "R")
+        gates += stream_pair_gates(layout, i, j, "L")
+    return gates
+
+def mix_site_gates(layout: Layout1D, i: int, theta: float, theta_drag: float) -> GateList:
+    Di = layout.idx_D(i)
+    Ri = layout.idx_R(i)
+    return [
+        Gate("X", (Ri,)),
+        Gate("CRY", (Ri, Di), float(theta)),
+        Gate("X", (Ri,)),
+        Gate("CRY", (Ri, Di), float(theta_drag)),
+    ]
+
+def mix_all_gates(layout: Layout1D, theta: float, theta_drag: float) -> GateList:
+    gates: GateList = []
+    for i in range(layout.N):
+        gates += mix_site_gates(layout, i, theta, theta_drag)
+    return gates
+
+def relax_all_gates(layout: Layout1D, lambda_mix: float, mu_scramble: float) -> GateList:
+    if not layout.use_reservoir:
+        return []
+    gates: GateList = []
+    for i in range(layout.N):
+        Ri = layout.idx_R(i)
+        Mi = layout.idx_M(i)
+        gates.append(Gate("RM", (Ri, Mi), float(lambda_mix)))
+        if mu_scramble is not None and abs(mu_scramble) > 0:
+            gates.append(Gate("RY", (Mi,), float(mu_scramble)))
+    return gates
+
+def ren_all_gates(layout: Layout1D, eta0: float) -> GateList:
+    gates: GateList = []
+    N = layout.N
+    for i in range(0, N, 2):
+        j = (i + 1) % N
+        gates += overlap_probe_gates(layout, i, j)
+        gates += regulator_integrate_gates(layout, i, eta0)
+        gates += overlap_probe_gates(layout, i, j)
+    return gates
+
+def tick_gates(layout: Layout1D,
+               eta0: float,
+               theta: float,
+               theta_drag: float,
+               lambda_mix: float = 0.0,
+               mu_scramble: float = 0.0) -> GateList:
+    """Uncompiled gate list of one tick (same order as U_tick)."""
+    return (ren_all_gates(layout, eta0)
+            + stream_1d_gates(layout)
+            + mix_all_gates(layout, theta, theta_drag)
+            + relax_all_gates(layout, lambda_mix, mu_scramble))
+
+# -------------------------
+# Compilation
+# -------------------------
+
+def _same_support(a: Gate, b: Gate) -> bool:
+    if a.kind != b.kind:
+        return False
+    if a.kind == "CSWAP":
+        # swap targets are unordered
+        return a.qubits[0] == b.qubits[0] and set(a.qubits[1:]) == set(b.qubits[1:])
+    if a.kind == "RM":
+        # (XX+YY)/2 is symmetric in its two qubits
+        return set(a.qubits) == set(b.qubits)
+    return a.qubits == b.qubits
+
+def fuse(gates: Sequence[Gate], atol: float = 1e-12) -> GateList:
+    """
+    Peephole-fuse a gate list (see module docstring for the rules).
+
+    Each incoming gate is compared with the last kept gate that touches any
+    of its qubits; a cancellation can expose a further one, which the next
+    incoming gate then sees.
+    """
+    out: List[Optional[Gate]] = []
+
+    for g in gates:
+        if g.kind in ROTATIONS and abs(g.angle) <= atol:
+            continue
+
+        prev_idx = None
+        for k in range(len(out) - 1, -1, -1):
+            p = out[k]
+            if p is not None and set(p.qubits) & set(g.qubits):
+                prev_idx = k
+                break
+
+        if prev_idx is not None and _same_support(out[prev_idx], g):
+            p = out[prev_idx]
+            if g.kind in SELF_INVERSE:
+                out[prev_idx] = None
+                continue
+            angle = p.angle + g.angle
+            out[prev_idx] = None if abs(angle) <= atol else Gate(p.kind, p.qubits, angle)
+            continue
+
+        out.append(g)
+
+    return [g for g in out if g is not None]
+
+def compile_tick(layout: Layout1D,
+                 eta0: float,
+                 theta: float,
+                 theta_drag: float,
+                 lambda_mix: float = 0.0,
+                 mu_scramble: float = 0.0) -> GateList:
+    """Fused gate list of one tick; build once, execute every tick."""
+    return fuse(tick_gates(layout, eta0, theta, theta_drag, lambda_mix, mu_scramble))
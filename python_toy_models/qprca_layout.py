@@ -0,0 +1,50 @@
+"""
+qprca_layout.py
+------------------------------------------------------------
+Qubit layout of the HPF-QPRCA 1+1D toy (site registers D_i, R_i, M_i and
+the global ancilla A).
+
+Kept free of qutip so the NumPy backends (qprca_statevector, qprca_sweep,
+qprca_observables) import without it; qprca_block_gate_1d re-exports
+Layout1D for existing imports.
+------------------------------------------------------------
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class Layout1D:
+    """
+    Qubit ordering in the total Hilbert space:
+
+    [ D_0, R_0, M_0,  D_1, R_1, M_1,  ... ,  D_{N-1}, R_{N-1}, M_{N-1},  A ]
+
+    If use_reservoir=False, we omit M_i, and layout becomes:
+    [ D_0, R_0,  D_1, R_1, ... , D_{N-1}, R_{N-1},  A ]
+    """
+    N: int
+    use_reservoir: bool = True
+
+    def idx_D(self, i: int) -> int:
+        if self.use_reservoir:
+            return 3 * i + 0
+        return 2 * i + 0
+
+    def idx_R(self, i: int) -> int:
+        if self.use_reservoir:
+            return 3 * i + 1
+        return 2 * i + 1
+
+    def idx_M(self, i: int) -> int:
+        if not self.use_reservoir:
+            raise ValueError("Reservoir disabled; no M index.")
+        return 3 * i + 2
+
+    @property
+    def idx_A(self) -> int:
+        return (3 * self.N) if self.use_reservoir else (2 * self.N)
+
+    @property
+    def n_qubits(self) -> int:
+        return self.idx_A + 1
@@ -0,0 +1,165 @@
+"""
+qprca_observables.py
+------------------------------------------------------------
+Cheap per-tick observables for the QPRCA toy harnesses.
+
+Reading <Z_{R_i}> or P(D_i=0) through expect() needs a full-size expanded
+operator per site per tick. All of these are single-qubit marginals, so we
+compute every one-qubit reduced density matrix in one sweep over the state
+tensor instead:
+
+    rho_q = Tr_{all but q} |psi><psi|  =  A_q A_q^dagger,
+    A_q   = psi with axis q moved to the front, reshaped to (2, 2^(n-1)).
+
+That is O(n * 2^n) per tick for all sites together, with no operator larger
+than 2x2. Works for qutip kets (anything with .full()) and for the NumPy
+tensors of qprca_statevector.py, including leading batch axes.
+
+ColumnRecorder streams the per-tick values to a directory of column files
+(one raw float64 file per observable, plus a small JSON header), so long runs
+can be analysed afterwards with read_columns() instead of scraping prints.
+------------------------------------------------------------
+"""
+
+from __future__ import annotations
+import json
+import os
+from typing import Dict, Sequence
+
+import numpy as np
+
+from qprca_layout import Layout1D
+
+Z_MAT = np.array([[1, 0], [0, -1]], dtype=complex)
+P0_MAT = np.array([[1, 0], [0, 0]], dtype=complex)
+
+# -------------------------
+# Reduced density matrices
+# -------------------------
+
+def state_tensor(layout: Layout1D, psi) -> np.ndarray:
+    """qutip ket, flat vector or (2,)*n tensor -> (batch..., 2, ..., 2) array."""
+    arr = psi.full() if hasattr(psi, "full") else np.asarray(psi)
+    n = layout.n_qubits
+    if arr.shape[-n:] == (2,) * n and arr.ndim >= n:
+        return arr
+    if arr.ndim == 2 and arr.shape[1] == 1:  # qutip column ket
+        arr = arr[:, 0]
+    return arr.reshape(arr.shape[:-1] + (2,) * n)
+
+def single_qubit_rdms(layout: Layout1D, psi) -> np.ndarray:
+    """All one-qubit reduced density matrices, shape batch + (n_qubits, 2, 2)."""
+    psi = state_tensor(layout, psi)
+    n = layout.n_qubits
+    nb = psi.ndim - n
+    batch = psi.shape[:nb]
+
+    rdms = np.empty(batch + (n, 2, 2), dtype=complex)
+    for q in range(n):
+        A = np.moveaxis(psi, nb + q, nb).reshape(batch + (2, -1))
+        rdms[..., q, :, :] = A @ np.conj(np.swapaxes(A, -1, -2))
+    return rdms
+
+def expect_1q(rdms: np.ndarray, op: np.ndarray) -> np.ndarray:
+    """<op> on every qubit from a stack of RDMs: Tr(rho op), real part."""
+    return np.einsum("...ij,ji->...", rdms, op).real
+
+def site_observables(layout: Layout1D, psi) -> Dict[str, np.ndarray]:
+    """
+    Harness observables from one RDM sweep:
+      norm, Z_R (<Z> on each R_i), P_D0 (P(D_i=0)).
+    """
+    rdms = single_qubit_rdms(layout, psi)
+    R = [layout.idx_R(i) for i in range(layout.N)]
+    D = [layout.idx_D(i) for i in range(layout.N)]
+    return {
+        # every RDM has the full norm as its trace; qubit 0's is as good as any
+        "norm": np.trace(rdms[..., 0, :, :], axis1=-2, axis2=-1).real,
+        "Z_R": expect_1q(rdms[..., R, :, :], Z_MAT),
+        "P_D0": expect_1q(rdms[..., D, :, :], P0_MAT),
+    }
+
+# -------------------------
+# Streaming columnar recorder
+# -------------------------
+
+class ColumnRecorder:
+    """
+    Append-only column store: <directory>/<column>.f64 plus columns.json.
+
+    Columns are fixed at construction. record() takes one value per column
+    and appends it to a buffered column file. columns.json (and its row
+    count) is rewritten by flush() and close(), so the header matches the
+    data on disk after flush(); read_columns() reads only the rows the
+    header counts.
+    """
+
+    def __init__(self, directory: str, columns: Sequence[str], meta: dict | None = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.columns = list(columns)
+        self.rows = 0
+        self._files = {c: open(os.path.join(directory, f"{c}.f64"), "wb") for c in self.columns}
+        self._meta = dict(meta or {})
+        self._write_header()
+
+    @classmethod
+    def for_layout(cls, directory: str, layout: Layout1D, meta: dict | None = None) -> "ColumnRecorder":
+        cols = ["t", "norm"]
+        cols += [f"Z_R{i}" for i in range(layout.N)]
+        cols += [f"P_D0_{i}" for i in range(layout.N)]
+        meta = dict(meta or {}, N=layout.N, use_reservoir=layout.use_reservoir)
+        return cls(directory, cols, meta)
+
+    def record(self, **values: float) -> None:
+        missing = set(self.columns) - set(values)
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(missing)}")
+        for c in self.columns:
+            self._files[c].write(np.float64(values[c]).tobytes())
+        self.rows += 1
+
+    def record_observables(self, t: int, obs: Dict[str, np.ndarray]) -> None:
+        """Record one tick of site_observables() (unbatched state)."""
+        row = {"t": t, "norm": float(obs["norm"])}
+        for i, z in enumerate(obs["Z_R"]):
+            row[f"Z_R{i}"] = float(z)
+        for i, p in enumerate(obs["P_D0"]):
+            row[f"P_D0_{i}"] = float(p)
+        self.record(**row)
+
+    def flush(self) -> None:
+        for f in self._files.values():
+            f.flush()
+        self._write_header()
+
+    def close(self) -> None:
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self) -> "ColumnRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _write_header(self) -> None:
+        path = os.path.join(self.directory, "columns.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump({"columns": self.columns, "rows": self.rows, "meta": self._meta}, f, indent=2)
+        os.replace(path + ".tmp", path)  # readers never see a half-written header
+
+def read_columns(directory: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """Load (or memory-map) every column written by a ColumnRecorder."""
+    with open(os.path.join(directory, "columns.json")) as f:
+        header = json.load(f)
+    rows = header["rows"]
+    out = {}
+    for c in header["columns"]:
+        path = os.path.join(directory, f"{c}.f64")
+        if mmap and rows > 0:
+            out[c] = np.memmap(path, dtype=np.float64, mode="r", shape=(rows,))
+        else:
+            out[c] = np.fromfile(path, dtype=np.float64, count=rows)
+    return out
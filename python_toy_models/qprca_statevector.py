@@ -0,0 +1,409 @@
+"""
+qprca_statevector.py
+------------------------------------------------------------
+Gate-by-gate NumPy statevector backend for qprca_block_gate_1d.py.
+
+The qutip reference builds every layer as a full 2^n x 2^n operator and
+multiplies them together, so memory grows as 4^n. Here the state is kept as a
+rank-n tensor of shape (2, 2, ..., 2) (one axis per qubit, same ordering as
+Layout1D) and every 1-, 2- and 3-qubit gate is applied directly to it:
+
+  - permutation gates (X, CNOT, SWAP, CSWAP) are masked slice swaps,
+  - (controlled) single-qubit rotations are 2x2 updates on slice pairs,
+  - generic k-qubit gates are a tensordot over the k target axes.
+
+A full tick therefore costs O(gates * 2^n) time and O(2^n) memory, which makes
+N=6..8 sites with the reservoir enabled practical on a single machine.
+
+Any number of leading batch axes is allowed: the qubits are always the *last*
+layout.n_qubits axes of the array. Rotation angles (eta0, theta, ...) may be
+arrays of the batch shape, giving one parameter set per batch entry; this is
+what qprca_sweep.py uses to evolve a whole parameter grid in one pass.
+
+Conventions (identical to the qutip reference):
+  - qubit 0 is the most significant bit of the flattened state vector,
+  - Ry(theta) = [[cos(theta/2), -sin(theta/2)], [sin(theta/2), cos(theta/2)]],
+  - all apply_* functions update psi in place and return it.
+------------------------------------------------------------
+"""
+
+from __future__ import annotations
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from qprca_layout import Layout1D
+from qprca_gates import Gate
+
+# -------------------------
+# Gate matrices (plain NumPy)
+# -------------------------
+
+def I_mat() -> np.ndarray:
+    return np.eye(2, dtype=complex)
+
+def H_mat() -> np.ndarray:
+    return np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2.0)
+
+def X_mat() -> np.ndarray:
+    return np.array([[0, 1], [1, 0]], dtype=complex)
+
+def Z_mat() -> np.ndarray:
+    return np.array([[1, 0], [0, -1]], dtype=complex)
+
+def _mat2(a, b, c, d) -> np.ndarray:
+    """Stack [[a, b], [c, d]] along two trailing axes (entries may be arrays)."""
+    a, b, c, d = np.broadcast_arrays(a, b, c, d)
+    out = np.empty(a.shape + (2, 2), dtype=complex)
+    out[..., 0, 0], out[..., 0, 1] = a, b
+    out[..., 1, 0], out[..., 1, 1] = c, d
+    return out
+
+def Ry_mat(theta) -> np.ndarray:
+    """Ry(theta); an array of angles gives a stack of shape theta.shape + (2, 2)."""
+    theta = np.asarray(theta, dtype=float)
+    c, s = np.cos(theta / 2.0), np.sin(theta / 2.0)
+    return _mat2(c, -s, s, c)
+
+def RM_mat(lambda_mix: float) -> np.ndarray:
+    """
+    exp(-i * lambda * (XX+YY)/2) on (R, M), written out in closed form.
+
+    (XX+YY)/2 only couples |01> and |10>, so the unitary is an iSWAP-like
+    rotation inside that subspace and identity on |00>, |11>.
+    """
+    c, s = np.cos(lambda_mix), -1j * np.sin(lambda_mix)
+    return np.array([[1, 0, 0, 0],
+                     [0, c, s, 0],
+                     [0, s, c, 0],
+                     [0, 0, 0, 1]], dtype=complex)
+
+def RM_block(lambda_mix) -> np.ndarray:
+    """The nontrivial 2x2 block of RM_mat on (|01>, |10>); vectorised like Ry_mat."""
+    lambda_mix = np.asarray(lambda_mix, dtype=float)
+    c, s = np.cos(lambda_mix), -1j * np.sin(lambda_mix)
+    return _mat2(c, s, s, c)
+
+# -------------------------
+# State construction
+# -------------------------
+
+def basis_state(layout: Layout1D,
+                D_bits: Sequence[int],
+                R_bits: Sequence[int],
+                M_bits: Optional[Sequence[int]] = None,
+                A_bit: int = 0) -> np.ndarray:
+    """
+    Build |D0,R0,M0, D1,R1,M1, ..., A> as a (2,)*n tensor.
+    """
+    bits = [0] * layout.n_qubits
+    for i in range(layout.N):
+        bits[layout.idx_D(i)] = D_bits[i]
+        bits[layout.idx_R(i)] = R_bits[i]
+        if layout.use_reservoir:
+            if M_bits is None:
+                raise ValueError("Reservoir enabled, but M_bits not provided.")
+            bits[layout.idx_M(i)] = M_bits[i]
+    bits[layout.idx_A] = A_bit
+
+    psi = np.zeros((2,) * layout.n_qubits, dtype=complex)
+    psi[tuple(bits)] = 1.0
+    return psi
+
+def as_vector(layout: Layout1D, psi: np.ndarray) -> np.ndarray:
+    """Flatten the qubit axes (keeps any leading batch axes)."""
+    batch = psi.shape[:psi.ndim - layout.n_qubits]
+    return psi.reshape(batch + (2 ** layout.n_qubits,))
+
+def as_tensor(layout: Layout1D, vec: np.ndarray) -> np.ndarray:
+    """Inverse of as_vector: split the last axis into one axis per qubit."""
+    vec = np.asarray(vec, dtype=complex)
+    batch = vec.shape[:-1]
+    return vec.reshape(batch + (2,) * layout.n_qubits)
+
+def norm(layout: Layout1D, psi: np.ndarray) -> np.ndarray:
+    """<psi|psi> per batch entry (a 0-d array without batch axes)."""
+    axes = tuple(range(psi.ndim - layout.n_qubits, psi.ndim))
+    return np.sum(np.abs(psi) ** 2, axis=axes)
+
+def prob_zero(layout: Layout1D, psi: np.ndarray) -> np.ndarray:
+    """P(q=0) for every qubit q, shape batch + (n_qubits,)."""
+    n = layout.n_qubits
+    prob = np.abs(psi) ** 2
+    out = []
+    for q in range(n):
+        sub = prob[_index(layout, prob, {q: 0})]
+        out.append(np.sum(sub, axis=tuple(range(sub.ndim - (n - 1), sub.ndim))))
+    return np.stack(out, axis=-1)
+
+# -------------------------
+# Index helpers
+# -------------------------
+
+def _axis(layout: Layout1D, psi: np.ndarray, q: int) -> int:
+    return psi.ndim - layout.n_qubits + q
+
+def _index(layout: Layout1D, psi: np.ndarray, fixed: dict) -> tuple:
+    """Index tuple selecting qubit values {q: bit}, full slices elsewhere."""
+    idx = [slice(None)] * psi.ndim
+    for q, bit in fixed.items():
+        idx[_axis(layout, psi, q)] = bit
+    return tuple(idx)
+
+def _swap_slices(psi: np.ndarray, a: tuple, b: tuple) -> None:
+    tmp = psi[a].copy()
+    psi[a] = psi[b]
+    psi[b] = tmp
+
+def _rotate_slices(psi: np.ndarray, gate1: np.ndarray, s0: tuple, s1: tuple) -> None:
+    x0 = psi[s0].copy()
+    x1 = psi[s1]
+    # A stack of gates (shape batch + (2, 2)) acts entry-wise on the batch axes.
+    pad = (1,) * (x0.ndim - (gate1.ndim - 2))
+    g00, g01, g10, g11 = (gate1[..., r, c].reshape(gate1.shape[:-2] + pad)
+                          for r, c in ((0, 0), (0, 1), (1, 0), (1, 1)))
+    psi[s0] = g00 * x0 + g01 * x1
+    psi[s1] = g10 * x0 + g11 * x1
+
+# -------------------------
+# Gate application
+# -------------------------
+
+def apply_x(layout: Layout1D, psi: np.ndarray, target: int) -> np.ndarray:
+    _swap_slices(psi,
+                 _index(layout, psi, {target: 0}),
+                 _index(layout, psi, {target: 1}))
+    return psi
+
+def apply_cnot(layout: Layout1D, psi: np.ndarray, control: int, target: int) -> np.ndarray:
+    _swap_slices(psi,
+                 _index(layout, psi, {control: 1, target: 0}),
+                 _index(layout, psi, {control: 1, target: 1}))
+    return psi
+
+def apply_swap(layout: Layout1D, psi: np.ndarray, a: int, b: int) -> np.ndarray:
+    _swap_slices(psi,
+                 _index(layout, psi, {a: 0, b: 1}),
+                 _index(layout, psi, {a: 1, b: 0}))
+    return psi
+
+def apply_cswap(layout: Layout1D, psi: np.ndarray, control: int, a: int, b: int) -> np.ndarray:
+    """Fredkin gate as a masked swap: only the |1,0,1> <-> |1,1,0> blocks move."""
+    if len({control, a, b}) != 3:
+        raise ValueError("Qubits must be distinct for CSWAP.")
+    _swap_slices(psi,
+                 _index(layout, psi, {control: 1, a: 0, b: 1}),
+                 _index(layout, psi, {control: 1, a: 1, b: 0}))
+    return psi
+
+def apply_1(layout: Layout1D, psi: np.ndarray, gate1: np.ndarray, target: int) -> np.ndarray:
+    _rotate_slices(psi, np.asarray(gate1),
+                   _index(layout, psi, {target: 0}),
+                   _index(layout, psi, {target: 1}))
+    return psi
+
+def apply_controlled_1(layout: Layout1D,
+                       psi: np.ndarray,
+                       gate1: np.ndarray,
+                       control: int,
+                       target: int,
+                       control_value: int = 1) -> np.ndarray:
+    """Single-qubit gate on target, active only where control == control_value."""
+    if control == target:
+        raise ValueError("control and target must differ")
+    _rotate_slices(psi, np.asarray(gate1),
+                   _index(layout, psi, {control: control_value, target: 0}),
+                   _index(layout, psi, {control: control_value, target: 1}))
+    return psi
+
+def apply_rm(layout: Layout1D, psi: np.ndarray, lambda_mix, r: int, m: int) -> np.ndarray:
+    """RM_mat(lambda_mix) on (r, m) as a rotation of the |01>, |10> slices."""
+    if r == m:
+        raise ValueError("Qubits must be distinct for RM.")
+    _rotate_slices(psi, RM_block(lambda_mix),
+                   _index(layout, psi, {r: 0, m: 1}),
+                   _index(layout, psi, {r: 1, m: 0}))
+    return psi
+
+def apply_k(layout: Layout1D,
+            psi: np.ndarray,
+            gate: np.ndarray,
+            targets: Tuple[int, ...]) -> np.ndarray:
+    """
+    Generic k-qubit gate (2^k x 2^k, first target = most significant bit).
+
+    Contracts the gate with the target axes via tensordot, then moves the new
+    axes back into place. This is the fallback for dense gates such as U_rm.
+    """
+    k = len(targets)
+    if len(set(targets)) != k:
+        raise ValueError("Qubits must be distinct for gate application.")
+    g = np.asarray(gate).reshape((2,) * (2 * k))
+    axes = [_axis(layout, psi, q) for q in targets]
+    out = np.tensordot(g, psi, axes=(list(range(k, 2 * k)), axes))
+    psi[...] = np.moveaxis(out, list(range(k)), axes)
+    return psi
+
+def apply_2(layout: Layout1D, psi: np.ndarray, gate2: np.ndarray, targets: Tuple[int, int]) -> np.ndarray:
+    return apply_k(layout, psi, gate2, targets)
+
+def apply_3(layout: Layout1D, psi: np.ndarray, gate3: np.ndarray, targets: Tuple[int, int, int]) -> np.ndarray:
+    return apply_k(layout, psi, gate3, targets)
+
+# -------------------------
+# Layers (mirror the qutip builders one-to-one)
+# -------------------------
+
+def apply_overlap_probe(layout: Layout1D, psi: np.ndarray, i: int, j: int) -> np.ndarray:
+    """H(A) -> CSWAP(A, D_i, D_j) -> H(A); see overlap_probe_U."""
+    A = layout.idx_A
+    apply_1(layout, psi, H_mat(), A)
+    apply_cswap(layout, psi, A, layout.idx_D(i), layout.idx_D(j))
+    apply_1(layout, psi, H_mat(), A)
+    return psi
+
+def apply_regulator_integrate(layout: Layout1D, psi: np.ndarray, i: int, eta0: float) -> np.ndarray:
+    """Controlled Ry(eta0) on R_i, control = A; see regulator_integrate_from_A."""
+    return apply_controlled_1(layout, psi, Ry_mat(eta0), layout.idx_A, layout.idx_R(i))
+
+def apply_stream_pair(layout: Layout1D, psi: np.ndarray, i: int, j: int, direction: str) -> np.ndarray:
+    """Ancilla-decoupled conditional swap of D_i, D_j; see stream_pair_unitary."""
+    A = layout.idx_A
+    Di = layout.idx_D(i)
+    Dj = layout.idx_D(j)
+
+    if direction == "R":
+        # control predicate: (D_i == 0)
+        apply_x(layout, psi, Di)
+        apply_cnot(layout, psi, Di, A)
+        apply_x(layout, psi, Di)
+
+        apply_cswap(layout, psi, A, Di, Dj)
+
+        # uncompute A
+        apply_x(layout, psi, Di)
+        apply_cnot(layout, psi, Di, A)
+        apply_x(layout, psi, Di)
+
+    elif direction == "L":
+        # control predicate: (D_j == 1)
+        apply_cnot(layout, psi, Dj, A)
+        apply_cswap(layout, psi, A, Di, Dj)
+        apply_cnot(layout, psi, Dj, A)
+
+    else:
+        raise ValueError("direction must be 'R' or 'L'")
+
+    return psi
+
+def apply_stream_1d(layout: Layout1D, psi: np.ndarray) -> np.ndarray:
+    N = layout.N
+    for i in range(0, N, 2):
+        j = (i + 1) % N
+        apply_stream_pair(layout, psi, i, j, "R")
+        apply_stream_pair(layout, psi, i, j, "L")
+    return psi
+
+def apply_mix_site(layout: Layout1D, psi: np.ndarray, i: int, theta: float, theta_drag: float) -> np.ndarray:
+    """Ry(theta) on D_i if R_i=0, Ry(theta_drag) if R_i=1; see U_mix_site."""
+    Di = layout.idx_D(i)
+    Ri = layout.idx_R(i)
+    apply_controlled_1(layout, psi, Ry_mat(theta), Ri, Di, control_value=0)
+    apply_controlled_1(layout, psi, Ry_mat(theta_drag), Ri, Di, control_value=1)
+    return psi
+
+def apply_mix_all(layout: Layout1D, psi: np.ndarray, theta: float, theta_drag: float) -> np.ndarray:
+    for i in range(layout.N):
+        apply_mix_site(layout, psi, i, theta, theta_drag)
+    return psi
+
+def apply_relax_all(layout: Layout1D, psi: np.ndarray, lambda_mix: float, mu_scramble: float) -> np.ndarray:
+    """Partial swap R_i <-> M_i plus optional Ry(mu) on M_i; see U_relax_all."""
+    if not layout.use_reservoir:
+        return psi
+    scramble = mu_scramble is not None and np.any(np.abs(mu_scramble) > 0)
+    for i in range(layout.N):
+        Ri = layout.idx_R(i)
+        Mi = layout.idx_M(i)
+        apply_rm(layout, psi, lambda_mix, Ri, Mi)
+        if scramble:
+            apply_1(layout, psi, Ry_mat(mu_scramble), Mi)
+    return psi
+
+def apply_ren_all(layout: Layout1D, psi: np.ndarray, eta0: float) -> np.ndarray:
+    N = layout.N
+    for i in range(0, N, 2):
+        j = (i + 1) % N
+        apply_overlap_probe(layout, psi, i, j)
+        apply_regulator_integrate(layout, psi, i, eta0)
+        # uncompute probe to return A to |0>:
+        apply_overlap_probe(layout, psi, i, j)
+    return psi
+
+def apply_tick(layout: Layout1D,
+               psi: np.ndarray,
+               eta0: float,
+               theta: float,
+               theta_drag: float,
+               lambda_mix: float = 0.0,
+               mu_scramble: float = 0.0) -> np.ndarray:
+    """
+    One full tick, same layer order as U_tick: ren -> stream -> mix -> relax.
+    """
+    apply_ren_all(layout, psi, eta0)
+    apply_stream_1d(layout, psi)
+    apply_mix_all(layout, psi, theta, theta_drag)
+    apply_relax_all(layout, psi, lambda_mix, mu_scramble)
+    return psi
+
+# -------------------------
+# Gate-list executor (see qprca_gates.py)
+# -------------------------
+
+def apply_gate(layout: Layout1D, psi: np.ndarray, gate: Gate) -> np.ndarray:
+    kind, q = gate.kind, gate.qubits
+    if kind == "H":
+        return apply_1(layout, psi, H_mat(), q[0])
+    if kind == "X":
+        return apply_x(layout, psi, q[0])
+    if kind == "RY":
+        return apply_1(layout, psi, Ry_mat(gate.angle), q[0])
+    if kind == "CNOT":
+        return apply_cnot(layout, psi, q[0], q[1])
+    if kind == "CRY":
+        return apply_controlled_1(layout, psi, Ry_mat(gate.angle), q[0], q[1])
+    if kind == "CSWAP":
+        return apply_cswap(layout, psi, q[0], q[1], q[2])
+    if kind == "RM":
+        return apply_rm(layout, psi, gate.angle, q[0], q[1])
+    raise ValueError(f"Unsupported gate kind: {kind!r}")
+
+def apply_gates(layout: Layout1D, psi: np.ndarray, gates: Sequence[Gate]) -> np.ndarray:
+    for gate in gates:
+        apply_gate(layout, psi, gate)
+    return psi
+
+def main():
+    import time
+
+    params = dict(
+        eta0=np.pi / 16,
+        theta=np.pi / 32,
+        theta_drag=np.pi / 128,
+        lambda_mix=0.25,
+        mu_scramble=0.05,
+    )
+
+    for N in (2, 4, 6):
+        layout = Layout1D(N=N, use_reservoir=True)
+        D0 = [i % 2 for i in range(N)]
+        psi = basis_state(layout, D0, [0] * N, [0] * N)
+
+        t0 = time.perf_counter()
+        apply_tick(layout, psi, **params)
+        dt = time.perf_counter() - t0
+        print(f"N={N}  n_qubits={layout.n_qubits:2d}  tick={dt * 1e3:9.2f} ms  "
+              f"norm={float(norm(layout, psi)):.6f}")
+
+if __name__ == "__main__":
+    main()
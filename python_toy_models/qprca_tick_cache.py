@@ -0,0 +1,191 @@
+"""
+qprca_tick_cache.py
+------------------------------------------------------------
+Parameter-keyed cache for the dense one-tick operator of the toy harness.
+
+The operator is built from the fused gate list of a tick,
+U_from_gates(layout, compile_tick(...)) (qprca_gates), not from the layer
+builders behind qprca_block_gate_1d.U_tick. Multiplying the whole chain of
+expanded 2^n x 2^n gates dominates harness run time, and the operator only
+depends on (Layout1D, eta0, theta, theta_drag, lambda_mix, mu_scramble), so
+we build it once per key and reuse it:
+
+  - in memory: an LRU of the most recently used operators (maxsize entries),
+  - optionally on disk: one scipy sparse CSR .npz per key in cache_dir, so
+    parameter sweeps that revisit a setting skip construction entirely, even
+    across processes / sessions.
+
+The disk key is a hash of the full parameter tuple; the layout is stored
+alongside the matrix and checked on load.
+------------------------------------------------------------
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+import hashlib
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from qutip import Qobj
+
+from qprca_block_gate_1d import Layout1D, U_from_gates
+from qprca_gates import compile_tick
+
+TickKey = Tuple[Layout1D, float, float, float, float, float]
+
+def build_tick_operator(key: TickKey) -> Qobj:
+    """Tick operator for one cache key, multiplied out from the fused gate list."""
+    layout = key[0]
+    return U_from_gates(layout, compile_tick(layout, *key[1:]))
+
+class TickCache:
+    """
+    LRU cache of tick operators with an optional .npz store.
+
+    maxsize:   number of operators kept in memory (oldest evicted first).
+    cache_dir: directory for the on-disk store, or None to disable it.
+    """
+
+    def __init__(self, maxsize: int = 8, cache_dir: Optional[str] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._ops: "OrderedDict[TickKey, Qobj]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(layout: Layout1D,
+            eta0: float,
+            theta: float,
+            theta_drag: float,
+            lambda_mix: float = 0.0,
+            mu_scramble: float = 0.0) -> TickKey:
+        return (layout, float(eta0), float(theta), float(theta_drag),
+                float(lambda_mix), float(mu_scramble))
+
+    def get(self,
+            layout: Layout1D,
+            eta0: float,
+            theta: float,
+            theta_drag: float,
+            lambda_mix: float = 0.0,
+            mu_scramble: float = 0.0) -> Qobj:
+        """Return the tick operator for these parameters, building it only on a miss."""
+        key = self.key(layout, eta0, theta, theta_drag, lambda_mix, mu_scramble)
+
+        if key in self._ops:
+            self._ops.move_to_end(key)
+            self.hits += 1
+            return self._ops[key]
+
+        U = self._load(key)
+        if U is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            U = build_tick_operator(key)
+            self._save(key, U)
+
+        self._ops[key] = U
+        if len(self._ops) > self.maxsize:
+            self._ops.popitem(last=False)
+        return U
+
+    def clear(self, disk: bool = False) -> None:
+        """Drop the in-memory entries (and the .npz store if disk=True)."""
+        self._ops.clear()
+        if disk and self.cache_dir is not None:
+            for name in os.listdir(self.cache_dir):
+                if name.startswith("tick_") and name.endswith(".npz"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    # -------------------------
+    # On-disk store
+    # -------------------------
+
+    def _path(self, key: TickKey) -> str:
+        layout = key[0]
+        tag = repr((layout.N, layout.use_reservoir) + key[1:])
+        digest = hashlib.sha1(tag.encode("ascii")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"tick_{digest}.npz")
+
+    def _save(self, key: TickKey, U: Qobj) -> None:
+        if self.cache_dir is None:
+            return
+        csr = sp.csr_matrix(U.data)
+        layout = key[0]
+        np.savez_compressed(
+            self._path(key),
+            data=csr.data, indices=csr.indices, indptr=csr.indptr,
+            shape=np.array(csr.shape),
+            layout=np.array([layout.N, int(layout.use_reservoir)]),
+            params=np.array(key[1:]),
+        )
+
+    def _load(self, key: TickKey) -> Optional[Qobj]:
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        layout = key[0]
+        with np.load(path) as f:
+            if (tuple(f["layout"]) != (layout.N, int(layout.use_reservoir))
+                    or tuple(f["params"]) != key[1:]):
+                return None
+            csr = sp.csr_matrix((f["data"], f["indices"], f["indptr"]),
+                                shape=tuple(f["shape"]))
+        dims = [[2] * layout.n_qubits, [2] * layout.n_qubits]
+        return Qobj(csr, dims=dims)
+
+# Shared default cache used by the toy harness.
+tick_cache = TickCache()
+
+def cached_tick_operator(layout: Layout1D, **params) -> Qobj:
+    """Tick operator of compile_tick(layout, **params), from the shared tick_cache."""
+    return tick_cache.get(layout, **params)
+
+def main():
+    """Check that a fresh build, an LRU hit and a .npz round-trip agree."""
+    import tempfile
+
+    from qprca_statevector import apply_tick, basis_state
+
+    layout = Layout1D(N=2, use_reservoir=True)
+    params = dict(eta0=np.pi / 16, theta=np.pi / 32, theta_drag=np.pi / 128,
+                  lambda_mix=0.25, mu_scramble=0.05)
+    fresh = build_tick_operator(TickCache.key(layout, **params)).full()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TickCache(maxsize=2, cache_dir=cache_dir)
+        built = cache.get(layout, **params)
+        hit = cache.get(layout, **params)
+        cache.clear()
+        loaded = cache.get(layout, **params)
+        assert (cache.misses, cache.hits, cache.disk_hits) == (1, 1, 1)
+
+    for name, U in (("built", built), ("lru hit", hit), (".npz load", loaded)):
+        assert U.dims == [[2] * layout.n_qubits] * 2, name
+        err = np.abs(U.full() - fresh).max()
+        assert err < 1e-12, f"{name}: max |U - U_fresh| = {err:.2e}"
+
+    # and the operator is the tick of the NumPy backend
+    psi = basis_state(layout, [0, 1], [0, 0], [0, 0])
+    ref = apply_tick(layout, psi.copy(), **params).reshape(-1)
+    err = np.abs(fresh @ psi.reshape(-1) - ref).max()
+    assert err < 1e-12, f"tick operator vs apply_tick: {err:.2e}"
+    print(f"tick cache OK: fresh == LRU hit == .npz round-trip, "
+          f"{2 ** layout.n_qubits}x{2 ** layout.n_qubits} operator matches apply_tick")
+
+if __name__ == "__main__":
+    main()
@@ -19,10 +19,12 @@ Theoretical Basis:
 
 Usage:
     python simulate_flux.py
+    python simulate_flux.py --stream [TOL]   (run until SE(shadow floor) < TOL)
 """
 
 
 import random
+import sys
 import time
 
 
@@ -140,5 +142,47 @@ def run_hpf_simulation_v2():
         print("No saturation observed (increase input or decrease sink rate).")
 
 
+def run_hpf_simulation_streaming(tol=0.05, seed=None):
+    """
+    Same lattice and rules as run_hpf_simulation_v2, but with constant-memory
+    statistics (hpf_flux_stats): the warm-up is detected automatically and the
+    run stops once the standard error of the shadow floor is below tol.
+    """
+    from hpf_flux_engine import FluxParams
+    from hpf_flux_stats import run_streaming
+
+    params = FluxParams()
+    print("--- HPF Simulation: Horizon Saturation Protocol (streaming) ---")
+    print(f"[-] Saturation Limit: {params.saturation} bits/voxel")
+    print(f"[-] Input Flux: {params.input_rate}")
+    print(f"[-] Horizon Sink Rate: {params.sink_rate}")
+    print(f"[-] Target standard error: {tol}\n")
+
+    res = run_streaming(params, tol=tol, rng=random.Random(seed))
+
+    print(f"[-] Warm-up detected after {res.warmup} steps; stopped at step {res.steps}"
+          f"{'' if res.converged else ' (step limit, NOT converged)'}")
+    print(f"[-] Autocorrelation time: {res.tau:.1f} steps")
+    print(f"\n>> Average Shadow Floor Intensity: {res.mean:.3f} +/- {res.se:.3f} (SE)")
+
+
+    # Render ASCII Plot of the last steps
+    for step, val in res.tail:
+        print(f"T={step}: {'█' * val} ({val})")
+
+
+    print("-" * 30)
+    if res.mean - 2 * res.se > 0:
+        print("RESULT: SATURATION CONFIRMED.")
+        print("The horizon exhibits a non-zero reflective floor.")
+    else:
+        print("RESULT: CLASSICAL ABSORPTION.")
+        print("No saturation observed (increase input or decrease sink rate).")
+
+
 if __name__ == "__main__":
-    run_hpf_simulation_v2()
+    if "--stream" in sys.argv[1:]:
+        args = sys.argv[sys.argv.index("--stream") + 1:]
+        run_hpf_simulation_streaming(tol=float(args[0]) if args else 0.05)
+    else:
+        run_hpf_simulation_v2()